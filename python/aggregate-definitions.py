@@ -1,41 +1,71 @@
 import os
 import sys
-import glob
 
-def combine_files(target_dir, output_file):
+EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+DEFAULT_SKIP_DIRS = ('node_modules', 'dist', '.git')
+
+def find_files(target_dir, extensions=EXTENSIONS, skip_dirs=DEFAULT_SKIP_DIRS):
+    """
+    Yield the paths of all files under target_dir ending in one of the given extensions.
+
+    The tree is walked once with os.scandir. Directories named in skip_dirs are never
+    entered, and hidden files and directories are ignored, as they were with glob.
+    Files of a directory come in name order before its subdirectories, which are walked
+    in name order too, so output is stable between runs.
+    """
+    skip_dirs = set(skip_dirs)
+    stack = [target_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                if entry.name not in skip_dirs:
+                    subdirectories.append(entry.path)
+            elif entry.name.endswith(extensions):
+                yield entry.path
+        # pushed in reverse so they are popped in ascending order
+        stack.extend(reversed(subdirectories))
+
+def combine_files(target_dir, output_file, skip_dirs=DEFAULT_SKIP_DIRS):
     """
     Combine and format JavaScript and TypeScript files from a specified directory.
 
-    This function reads all .ts, .tsx, .js, .jsx files in the given target directory, 
-    excluding lines starting with 'import'. It formats the content by enclosing it 
-    within markdown code blocks, preceded by the filename. The formatted content is 
-    written to the specified output file. 
+    This function reads all .ts, .tsx, .js, .jsx files in the given target directory,
+    excluding lines starting with 'import'. It formats the content by enclosing it
+    within markdown code blocks, preceded by the filename. The formatted content is
+    written to the specified output file. Files are found in a single walk that skips
+    the directories in skip_dirs, and are streamed to the output line by line.
 
     Parameters:
     target_dir (str): The directory to search for files.
     output_file (str): The output file path (defaults: 'combined.md').
+    skip_dirs (iterable of str): Directory names not to descend into
+        (defaults: node_modules, dist, .git).
 
     Example usage:
-    python3 combine-files.py target_directory output_file
+    python3 combine-files.py target_directory output_file [skip_dir1,skip_dir2]
     """
-    types = ('**/*.ts', '**/*.tsx', '**/*.js', '**/*.jsx') 
-    files_grabbed = []
-    for files in types:
-        files_grabbed.extend(glob.glob(target_dir + files, recursive=True))
-
     with open(output_file, 'w') as outfile:
-        for fname in files_grabbed:
+        for fname in find_files(target_dir, skip_dirs=skip_dirs):
             outfile.write(f'{os.path.basename(fname)}\n```tsx\n')
             with open(fname) as infile:
-                lines = infile.readlines()
-                # Strip leading and trailing newlines
-                lines = [line for line in lines if line.strip()]
-                for line in lines:
-                    if not line.strip().startswith('import'):
+                for line in infile:
+                    # Drop blank lines and imports
+                    stripped = line.strip()
+                    if stripped and not stripped.startswith('import'):
                         outfile.write(line)
             outfile.write('```\n\n')
 
 if __name__ == "__main__":
     target_dir = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else os.getcwd() + '/combined.md'
-    combine_files(target_dir, output_file)
\ No newline at end of file
+    skip_dirs = sys.argv[3].split(',') if len(sys.argv) > 3 else DEFAULT_SKIP_DIRS
+    combine_files(target_dir, output_file, skip_dirs)
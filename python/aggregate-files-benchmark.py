@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+# built-in dependencies
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+
+def load_aggregate_files():
+    """Import aggregate-files.py (its hyphenated name rules out a plain import)."""
+    script = Path(__file__).with_name("aggregate-files.py")
+    spec = importlib.util.spec_from_file_location("aggregate_files", script)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_synthetic_tree(root: Path, file_count: int, seed: int = 0) -> list[str]:
+    """Create `file_count` small source files spread over nested directories."""
+    rng = random.Random(seed)
+    files = []
+    for i in range(file_count):
+        rel_path = f"pkg{i % 50}/mod{i % 1000}/file_{i}.py"
+        full_path = root / rel_path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [
+            f"{''.join(rng.choices(string.ascii_lowercase, k=8))} = {rng.randint(0, 10**6)}\n"
+            for _ in range(rng.randint(5, 60))
+        ]
+        full_path.write_text("".join(lines), encoding="utf-8")
+        files.append(rel_path)
+    files.sort()
+    return files
+
+
+def bench_jobs(aggregate_files, root: Path, files: list[str], jobs_list: list[int]):
+    print(f"⏱️  write_aggregate_markdown on {len(files):,} files")
+    baseline = None
+    for jobs in jobs_list:
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            start = time.perf_counter()
+            aggregate_files.write_aggregate_markdown(root, devnull, files, debug=False, jobs=jobs)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"  --jobs {jobs:<3} {elapsed:8.3f} s  ({baseline / elapsed:.2f}x)")
+
+
+def make_synthetic_paths(path_count: int, seed: int = 0) -> list[str]:
+    """Generate repo-like relative paths, with a share of them under vendored directories."""
+    rng = random.Random(seed)
+    top_dirs = ["src", "lib", "tests", "docs", "node_modules", "dist", ".vscode", "packages"]
+    exts = ["py", "ts", "tsx", "js", "css", "html", "md", "json", "lock"]
+    paths = []
+    for i in range(path_count):
+        depth = rng.randint(0, 5)
+        parts = [rng.choice(top_dirs)] + [f"d{rng.randint(0, 5)}" for _ in range(depth)]
+        paths.append("/".join(parts + [f"f{i}.{rng.choice(exts)}"]))
+    return paths
+
+
+def make_ignore_file(path: Path, base: Path, extra_patterns: int):
+    """Copy `base` and pad it with extra patterns to mimic a long ignore file."""
+    lines = base.read_text(encoding="utf-8").splitlines()
+    lines += [f"generated_{i}/" if i % 2 else f"*.gen{i}" for i in range(extra_patterns)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def bench_pathspec(aggregate_files, paths: list[str], ignore_path: Path):
+    import pathspec
+
+    print(f"⏱️  Filtering {len(paths):,} paths")
+    # Warm the on-disk pattern cache, as on any run after the first.
+    with contextlib.redirect_stdout(io.StringIO()):
+        aggregate_files.load_pathspec(ignore_path, debug=False)
+
+    processed = [
+        line if "/" in line or line.startswith("**/") else f"**/{line}"
+        for line in (raw.strip() for raw in ignore_path.read_text(encoding="utf-8").splitlines())
+        if line and not line.startswith("#")
+    ]
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", processed)
+    print(f"   {len(processed)} patterns")
+
+    start = time.perf_counter()
+    expected = [f for f in paths if not spec.match_file(f)]
+    loop_time = time.perf_counter() - start
+    print(f"  PathSpec.match_file loop   {loop_time:8.3f} s")
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        compiled = aggregate_files.load_pathspec(ignore_path, debug=False)
+        kept = aggregate_files.filter_with_pathspec(paths, compiled, debug=False)
+    compiled_time = time.perf_counter() - start
+    print(f"  CompiledIgnore (cached)    {compiled_time:8.3f} s  ({loop_time / compiled_time:.2f}x)")
+
+    assert kept == expected, "CompiledIgnore disagrees with PathSpec.match_file"
+    print(f"  ✅ Same {len(kept):,} paths kept by both")
+
+
+def main():
+    """
+    Benchmarks for aggregate-files.py.
+
+    Usage:
+        python aggregate-files-benchmark.py jobs [--files 50000] [--jobs 1 4 8 16] [--tree DIR]
+        python aggregate-files-benchmark.py pathspec [--paths 200000] [--extra-patterns 300]
+
+    Without --tree a synthetic tree is generated in a temporary directory. Run against a
+    network mount or after dropping the page cache to see the effect of parallel reads.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark aggregate-files.py stages.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    jobs_parser = subparsers.add_parser("jobs", help="Serial vs. threaded file reading.")
+    jobs_parser.add_argument("--files", type=int, default=50_000, help="Number of synthetic files.")
+    jobs_parser.add_argument("--jobs", type=int, nargs="+", default=[1, 4, 8, 16], help="Thread counts to compare.")
+    jobs_parser.add_argument("--tree", help="Build the synthetic tree here instead of a temporary directory.")
+
+    pathspec_parser = subparsers.add_parser("pathspec", help="PathSpec.match_file loop vs. CompiledIgnore.")
+    pathspec_parser.add_argument("--paths", type=int, default=200_000, help="Number of synthetic paths.")
+    pathspec_parser.add_argument("--extra-patterns", type=int, default=300, help="Patterns appended to the ignore file.")
+    pathspec_parser.add_argument(
+        "--ignore-file",
+        default=str(Path(__file__).resolve().parent.parent / "llm" / ".llmignore"),
+        help="Ignore file to start from (default: llm/.llmignore).",
+    )
+
+    args = parser.parse_args()
+    aggregate_files = load_aggregate_files()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.benchmark == "jobs":
+            root = Path(args.tree).resolve() if args.tree else Path(tmp)
+            print(f"🏗️  Building synthetic tree in {root}")
+            files = make_synthetic_tree(root, args.files)
+            bench_jobs(aggregate_files, root, files, args.jobs)
+        elif args.benchmark == "pathspec":
+            ignore_path = Path(tmp) / ".llmignore"
+            make_ignore_file(ignore_path, Path(args.ignore_file), args.extra_patterns)
+            bench_pathspec(aggregate_files, make_synthetic_paths(args.paths), ignore_path)
+
+
+if __name__ == "__main__":
+    main()
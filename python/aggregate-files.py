@@ -2,56 +2,420 @@
 
 # built-in dependencies
 import argparse
+import contextlib
+import fnmatch
+import gzip
+import hashlib
+import json
+import re
 import subprocess
 import sys
 import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import StringIO
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
 
 # external dependencies
 import pathspec
 import pyperclip
 
+# optional dependencies
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+# Size of the write buffer used when streaming to the output file. Each file is rendered
+# as one block (so it can be cached, hashed and indexed whole), so peak memory of the
+# pipeline is bounded by this plus the largest aggregated file, plus the --jobs read-ahead.
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# With --jobs, how many files each worker may read ahead of the writer, and how many bytes
+# of files (by size on disk) may be read ahead in total. Keeps the reorder window (and so
+# memory) bounded while the writer waits on a slow file, however large the files are.
+READ_AHEAD_PER_JOB = 4
+READ_AHEAD_BYTES = 64 * 1024 * 1024
+
+# How much of each file is inspected for NUL bytes when deciding whether it is binary.
+BINARY_SNIFF_SIZE = 8192
+
+# Token estimate used by --token-budget without a tokenizer: BPE tokenizers average roughly
+# four bytes of source code per token. BLOCK_OVERHEAD covers the path line and code fences.
+BYTES_PER_TOKEN = 4
+BLOCK_OVERHEAD = 12
+
+# Bucket upper bounds (in tokens) for the per-file token histogram.
+TOKEN_HISTOGRAM_BUCKETS = [256, 1024, 4096, 16384, 65536]
+
+# --watch waits this long after the last change before rebuilding, so that a burst of
+# writes (editor save, formatter, branch switch) triggers a single rebuild.
+WATCH_DEBOUNCE_SECONDS = 0.3
+# How often --watch re-checks the tree when inotify reports nothing (e.g. missed events).
+WATCH_IDLE_SECONDS = 30
+
+# Bump whenever the rendered block format changes, to invalidate existing --cache data.
+CACHE_VERSION = 2
+# Bump whenever the ignore pattern processing (e.g. the `**/` prefixing) changes, to
+# invalidate compiled patterns cached by load_pathspec. pathspec's version is checked too.
+PATHSPEC_CACHE_VERSION = 1
+# --cache packs that no index refers to (left by a killed or concurrent run) are deleted
+# once they are this old, so a pack another run is still writing is never removed.
+STALE_PACK_SECONDS = 24 * 3600
+
+
+def parse_size(value: str) -> int:
+    """Parse a byte count such as `4096`, `512K` or `2M` (binary units)."""
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    value = value.strip().upper().removesuffix("B")
+    try:
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Aggregate project files into a single Markdown file.")
     parser.add_argument("--dir", help="Path to the root of the git project.")
     parser.add_argument("--files", nargs="+", help="List of specific files to include.")
     parser.add_argument("--output-dir", help="Directory to save the output file.")
+    parser.add_argument(
+        "--format",
+        choices=["md", "md.gz", "md.zst"],
+        default="md",
+        help="Output file format for --output-dir (default: md).",
+    )
+    parser.add_argument("--chunk-size", type=parse_size, help="Split the output file into parts of about this size.")
+    parser.add_argument("--index", action="store_true", help="Write a JSONL index of block offsets (implied by --chunk-size).")
     parser.add_argument("--gitignore", help="Path to an additional .gitignore file.")
+    parser.add_argument(
+        "--enumerator",
+        choices=["auto", "git", "walk"],
+        default="auto",
+        help="How --dir files are listed: git ls-files, a .gitignore-aware directory walk, or auto (default).",
+    )
+    parser.add_argument("--cache", action="store_true", help="Reuse rendered blocks of unchanged files (--dir only).")
+    parser.add_argument("--cache-dir", help="Where to keep the --cache data (default: .git/aggregate-files-cache).")
+    parser.add_argument("--max-file-size", type=parse_size, help="Skip files larger than this (e.g. 512K, 2M).")
+    parser.add_argument("--max-total-bytes", type=parse_size, help="Total content budget: a file that would exceed it is skipped, smaller later files may still fit.")
+    parser.add_argument("--token-budget", type=int, help="Only include files until this many tokens are used.")
+    parser.add_argument(
+        "--tokenizer",
+        choices=["estimate", "tiktoken"],
+        default="estimate",
+        help="How to count tokens for --token-budget (default: estimate from file size).",
+    )
+    parser.add_argument(
+        "--priority", nargs="+", default=[], help="Glob patterns to fill the --token-budget with first, in order."
+    )
+    parser.add_argument("--watch", action="store_true", help="Keep running and rebuild the output when files change.")
+    parser.add_argument(
+        "--watch-interval", type=float, default=1.0, help="Polling interval in seconds for --watch without inotify."
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Number of threads used to read files (default: 1).")
     parser.add_argument("--debug", action="store_true", help="Show detailed output and read errors.")
     parser.add_argument("--to-clipboard", action="store_true", help="Copy output to clipboard")
+    parser.add_argument("--stdout", action="store_true", help="Stream output to stdout (logs go to stderr)")
     args = parser.parse_args()
 
     if bool(args.dir) == bool(args.files):  # both True or both False
-        print("❌ Error: You must provide exactly one of --dir or --files.")
+        print("❌ Error: You must provide exactly one of --dir or --files.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.cache and not args.dir:
+        print("❌ Error: --cache requires --dir.", file=sys.stderr)
+        sys.exit(1)
+
+    if (args.format != "md" or args.chunk_size or args.index) and not args.output_dir:
+        print("❌ Error: --format, --chunk-size and --index require --output-dir.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "md.zst" and not zstandard:
+        print("❌ Error: --format md.zst requires the zstandard package.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.watch and (args.stdout or args.cache):
+        print("❌ Error: --watch cannot be combined with --stdout or --cache.", file=sys.stderr)
+        sys.exit(1)
+
+    if args.tokenizer == "tiktoken" and not tiktoken:
+        print("❌ Error: --tokenizer tiktoken requires the tiktoken package.", file=sys.stderr)
         sys.exit(1)
 
     return args
 
 
-def run_git_ls_files(repo_path: Path) -> List[str]:
-    try:
-        result = subprocess.run(
-            ["git", "-C", str(repo_path), "ls-files", "--cached", "--others", "--exclude-standard"],
-            capture_output=True,
-            text=True,
-            check=True,
+def iter_git_ls_files(repo_path: Path, *flags: str) -> Iterator[str]:
+    """
+    Yield paths from `git ls-files -z` as git prints them, without waiting for it to finish.
+
+    Defaults to tracked plus untracked-but-not-ignored files. NUL-delimited output also
+    avoids git's quoting of unusual file names.
+    """
+    flags = flags or ("--cached", "--others", "--exclude-standard")
+    with tempfile.TemporaryFile() as stderr:
+        proc = subprocess.Popen(
+            ["git", "-C", str(repo_path), "ls-files", "-z", *flags],
+            stdout=subprocess.PIPE,
+            stderr=stderr,
         )
-        return result.stdout.strip().splitlines()
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error: git ls-files failed:\n{e.stderr}")
-        sys.exit(1)
+        pending = b""
+        for chunk in iter(lambda: proc.stdout.read1(OUTPUT_BUFFER_SIZE), b""):
+            *entries, pending = (pending + chunk).split(b"\0")
+            for entry in entries:
+                yield os.fsdecode(entry)
+        proc.stdout.close()
+        if proc.wait() != 0:
+            stderr.seek(0)
+            print(f"❌ Error: git ls-files failed:\n{stderr.read().decode(errors='replace')}")
+            sys.exit(1)
+
+
+def iter_scandir_files(root: Path) -> Iterator[str]:
+    """
+    Walk `root` with os.scandir and yield file paths relative to it, honouring .gitignore files.
+
+    For directories that are not git repositories (e.g. exported source trees). Each
+    .gitignore applies to its own directory and below, and ignored directories are not
+    entered. Unlike git, a negation cannot re-include a file ignored by a parent .gitignore.
+    """
+    def walk(directory: str, rel_dir: str, specs: List[tuple[str, pathspec.PathSpec]]):
+        gitignore = os.path.join(directory, ".gitignore")
+        if os.path.isfile(gitignore):
+            with open(gitignore, "r", encoding="utf-8", errors="replace") as f:
+                specs = specs + [(rel_dir, pathspec.PathSpec.from_lines("gitwildmatch", f))]
+
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+        except OSError:
+            return
+        for entry in entries:
+            rel_path = f"{rel_dir}{entry.name}"
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if is_dir and entry.name == ".git":
+                continue
+            candidate = rel_path + "/" if is_dir else rel_path
+            if any(spec.match_file(candidate[len(base):]) for base, spec in specs):
+                continue
+            if is_dir:
+                yield from walk(entry.path, rel_path + "/", specs)
+            elif entry.is_file():
+                yield rel_path
+
+    yield from walk(str(root), "", [])
+
+
+def run_git_ls_files_stage(repo_path: Path) -> Dict[str, Optional[str]]:
+    """
+    Map every file `iter_git_ls_files` would return to its git blob id.
+
+    The id comes from the index, so it is None for files whose working tree copy differs
+    from it (modified, unmerged or untracked); those have to be identified some other way.
+    """
+    object_ids: Dict[str, Optional[str]] = {}
+    for entry in iter_git_ls_files(repo_path, "--stage"):
+        info, rel_path = entry.split("\t", 1)
+        _mode, object_id, stage = info.split()
+        object_ids[rel_path] = object_id if stage == "0" and rel_path not in object_ids else None
+    for rel_path in iter_git_ls_files(repo_path, "--modified"):
+        object_ids[rel_path] = None
+    for rel_path in iter_git_ls_files(repo_path, "--others", "--exclude-standard"):
+        object_ids[rel_path] = None
+    return object_ids
+
+
+class BlockCache:
+    """
+    On-disk cache of rendered Markdown blocks, keyed by path and git blob id.
+
+    Blocks live back to back in a single pack file, in output order, with an index of
+    offsets next to it. Each run writes a fresh pack from the blocks it actually used, so
+    entries for deleted or changed files are evicted as a side effect. Files without a
+    usable blob id fall back to an (mtime, size) key.
 
+    Every pack has a unique name, recorded in the index, and the index is replaced
+    atomically after its pack is complete. An index therefore never points into another
+    pack, whether a run is killed while saving or two runs save at the same time.
+    """
+
+    def __init__(self, cache_dir: Path, repo_root: Path, object_ids: Dict[str, Optional[str]]):
+        self.cache_dir = cache_dir
+        self.repo_root = repo_root
+        self.object_ids = object_ids
+        self.index_path = cache_dir / "index.json"
+        self.hits = 0
+        self.misses = 0
+
+        self.entries = {}
+        self.pack = self.pack_path = None
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            if index.get("version") == CACHE_VERSION:
+                self.pack_path = cache_dir / index["pack"]
+                self.pack = self.pack_path.open("rb")
+                self.entries = index["entries"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.new_entries = {}
+        fd, new_pack_path = tempfile.mkstemp(prefix="blocks-", suffix=".md", dir=cache_dir)
+        self.new_pack_path = Path(new_pack_path)
+        self.new_pack = os.fdopen(fd, "wb", buffering=OUTPUT_BUFFER_SIZE)
+
+    def key_for(self, rel_path: str) -> Optional[str]:
+        object_id = self.object_ids.get(rel_path)
+        if object_id:
+            return f"git:{object_id}"
+        try:
+            st = (self.repo_root / rel_path).stat()
+        except OSError:
+            return None
+        return f"stat:{st.st_mtime_ns}:{st.st_size}"
+
+    def get(self, rel_path: str) -> Optional[tuple[str, int, Optional[str]]]:
+        entry = self.entries.get(rel_path)
+        key = self.key_for(rel_path)
+        if not entry or key is None or entry["key"] != key:
+            self.misses += 1
+            return None
+        self.pack.seek(entry["offset"])
+        block = self.pack.read(entry["length"]).decode("utf-8")
+        self.hits += 1
+        return block, entry["lines"], entry["error"]
+
+    def put(self, rel_path: str, block: str, line_count: int, error: Optional[str]):
+        key = self.key_for(rel_path)
+        if key is None:
+            return
+        data = block.encode("utf-8")
+        self.new_entries[rel_path] = {
+            "key": key,
+            "offset": self.new_pack.tell(),
+            "length": len(data),
+            "lines": line_count,
+            "error": error,
+        }
+        self.new_pack.write(data)
+
+    def save(self):
+        """Replace the previous pack and index with the blocks used by this run."""
+        if self.pack:
+            self.pack.close()
+        self.new_pack.close()
+        index = {"version": CACHE_VERSION, "pack": self.new_pack_path.name, "entries": self.new_entries}
+        fd, index_tmp = tempfile.mkstemp(prefix="index-", suffix=".json.tmp", dir=self.cache_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(index_tmp, self.index_path)
+
+        # only now is the previous pack unreferenced
+        if self.pack_path:
+            self.pack_path.unlink(missing_ok=True)
+        cutoff = time.time() - STALE_PACK_SECONDS
+        for path in [*self.cache_dir.glob("blocks*.md*"), *self.cache_dir.glob("index-*.json.tmp")]:
+            if path != self.new_pack_path:
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                except OSError:
+                    pass
+
+
+class CompiledIgnore:
+    """
+    Ignore patterns compiled into a single regex, matched with directory-level pruning.
 
-def load_pathspec(gitignore_path: Optional[Path], debug: bool) -> Optional[pathspec.PathSpec]:
+    Behaves like `pathspec.PathSpec.match_file` for gitwildmatch patterns. Every directory
+    is tested once; when it is excluded, all paths under it are excluded without running
+    the regex again. With negated (`!`) patterns the last match has to win, so the
+    patterns are then evaluated one by one, in order.
+    """
+
+    FLOATING_PREFIX = "^(?:.+/)?"
+
+    def __init__(self, patterns: List[tuple[str, bool]]):
+        self.patterns = [(re.compile(regex), include) for regex, include in patterns]
+        self.has_negation = not all(include for _, include in patterns)
+
+        # Named groups (e.g. pathspec's `ps_d`) would clash once the patterns are joined.
+        unnamed = [re.sub(r"\(\?P<\w+>", "(?:", regex) for regex, _ in patterns]
+        # Most patterns float (`**/name`). Sharing one `^(?:.+/)?` prefix between them saves
+        # the regex engine from backtracking through the path once per pattern.
+        floating = [r[len(self.FLOATING_PREFIX):] for r in unnamed if r.startswith(self.FLOATING_PREFIX)]
+        anchored = [r for r in unnamed if not r.startswith(self.FLOATING_PREFIX)]
+        alternatives = [f"(?:{r})" for r in anchored]
+        if floating:
+            alternatives.append(self.FLOATING_PREFIX + "(?:" + "|".join(f"(?:{r})" for r in floating) + ")")
+        self.combined = re.compile("|".join(alternatives) or r"(?!)")
+        self.excluded_dirs: Dict[str, bool] = {}
+
+    def match_file(self, path: str) -> bool:
+        if self.has_negation:
+            matched = False
+            for regex, include in self.patterns:
+                if regex.match(path):
+                    matched = include
+            return matched
+
+        start = 0
+        while (slash := path.find("/", start)) != -1:
+            directory = path[: slash + 1]
+            excluded = self.excluded_dirs.get(directory)
+            if excluded is None:
+                excluded = self.excluded_dirs[directory] = self.combined.match(directory) is not None
+            if excluded:
+                return True
+            start = slash + 1
+        return self.combined.match(path) is not None
+
+
+def user_cache_path(kind: str, key_path: Path) -> Path:
+    """Per-user cache location for data derived from `key_path`."""
+    cache_root = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "aggregate-files"
+    digest = hashlib.sha1(str(key_path.resolve()).encode("utf-8")).hexdigest()
+    return cache_root / f"{kind}-{digest}"
+
+
+def load_pathspec(gitignore_path: Optional[Path], debug: bool) -> Optional[CompiledIgnore]:
     if not gitignore_path or not gitignore_path.is_file():
         if debug:
             print("❌ .llmignore path is invalid or missing")
         return None
 
+    # Compiled patterns are cached per ignore file and reused until its mtime or size, the
+    # processing below or the pathspec version changes.
+    st = gitignore_path.stat()
+    cache_path = user_cache_path("pathspec", gitignore_path).with_suffix(".json")
+    cache_version = [PATHSPEC_CACHE_VERSION, pathspec.__version__]
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        if (
+            cached["version"] == cache_version
+            and cached["mtime_ns"] == st.st_mtime_ns
+            and cached["size"] == st.st_size
+        ):
+            if debug:
+                print(f"♻️  Using compiled patterns cached in {cache_path}")
+            print(f"✅ Loaded {len(cached['processed'])} processed patterns from {gitignore_path}")
+            return CompiledIgnore([tuple(p) for p in cached["patterns"]])
+    except (OSError, ValueError, KeyError):
+        pass
+
     with gitignore_path.open("r", encoding="utf-8") as f:
         raw_lines = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
 
@@ -67,29 +431,194 @@ def load_pathspec(gitignore_path: Optional[Path], debug: bool) -> Optional[paths
         for pat in processed:
             print(f"   - {pat}")
 
-    return pathspec.PathSpec.from_lines("gitwildmatch", processed)
+    spec = pathspec.PathSpec.from_lines("gitwildmatch", processed)
+    patterns = [(p.regex.pattern, p.include) for p in spec.patterns if p.include is not None]
 
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(
+            json.dumps({
+                "version": cache_version, "mtime_ns": st.st_mtime_ns, "size": st.st_size,
+                "processed": processed, "patterns": patterns,
+            }),
+            encoding="utf-8",
+        )
+    except OSError as e:
+        if debug:
+            print(f"⚠️  Could not cache compiled patterns: {e}")
+
+    return CompiledIgnore(patterns)
 
-def filter_with_pathspec(files: List[str], spec: Optional[pathspec.PathSpec], debug: bool) -> List[str]:
+
+def filter_with_pathspec(files: Iterable[str], spec: Optional[CompiledIgnore], debug: bool) -> List[str]:
+    """Filter `files`, which may be a stream that is still being produced by the enumerator."""
     if not spec:
         if debug:
             print("⚠️  No extra ignore patterns provided.")
-        return files
+        return list(files)
 
+    total = 0
     kept = []
+    match_file = spec.match_file
     for f in files:
-        if spec.match_file(f):
-            if debug:
-                print(f"❌ Excluded by .llmignore: {f}")
-        else:
+        total += 1
+        if not match_file(f):
             kept.append(f)
+        elif debug:
+            print(f"❌ Excluded by .llmignore: {f}")
 
-    print(f"✅ Kept {len(kept)} / {len(files)} files after filtering.")
+    print(f"✅ Kept {len(kept)} / {total} files after filtering.")
     return kept
 
 
+def inspect_file(full_path: Path) -> tuple[Optional[int], bool]:
+    """Return (size, looks_binary) from one stat and a read of the first BINARY_SNIFF_SIZE bytes."""
+    try:
+        size = full_path.stat().st_size
+        with full_path.open("rb") as f:
+            head = f.read(BINARY_SNIFF_SIZE)
+    except OSError:
+        return None, False
+    return size, b"\0" in head
+
+
+def prefilter_files(
+    repo_root: Path,
+    files: List[str],
+    max_file_size: Optional[int],
+    max_total_bytes: Optional[int],
+    debug: bool,
+    jobs: int = 1,
+) -> tuple[List[str], List[str], Dict[str, int]]:
+    """
+    Drop binary files and enforce size budgets before any file is read in full.
+
+    Files are considered in the given order, so with --max-total-bytes the earliest files win;
+    a file that does not fit is skipped and later, smaller files are still added if they do.
+    Unreadable files are kept so that the writer reports them as read errors, as before.
+    Returns the kept files, the excluded files with reasons, and the size of every kept
+    file that could be inspected.
+    """
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            inspected = list(pool.map(inspect_file, (repo_root / f for f in files)))
+    else:
+        inspected = [inspect_file(repo_root / f) for f in files]
+
+    kept = []
+    excluded = []
+    sizes = {}
+    total_bytes = 0
+    for rel_path, (size, looks_binary) in zip(files, inspected):
+        if size is None:
+            kept.append(rel_path)
+            continue
+        if looks_binary:
+            reason = "binary"
+        elif max_file_size is not None and size > max_file_size:
+            reason = f"{size:,} B > --max-file-size"
+        elif max_total_bytes is not None and total_bytes + size > max_total_bytes:
+            reason = "over --max-total-bytes"
+        else:
+            total_bytes += size
+            sizes[rel_path] = size
+            kept.append(rel_path)
+            continue
+        excluded.append(f"{rel_path} [{reason}]")
+        if debug:
+            print(f"❌ Excluded before reading: {rel_path} [{reason}]")
+
+    return kept, excluded, sizes
+
+
+def count_tokens(
+    repo_root: Path, files: List[str], sizes: Dict[str, int], tokenizer: str, jobs: int = 1
+) -> Dict[str, int]:
+    """
+    Token count of each file's Markdown block.
+
+    The default estimate uses only the sizes from the prefilter, so it costs no I/O and
+    handles 100k+ files in well under a second. `tiktoken` reads and encodes every file.
+    """
+    if tokenizer == "estimate":
+        return {
+            f: -(-(sizes.get(f, 0) + len(f) + BLOCK_OVERHEAD) // BYTES_PER_TOKEN)
+            for f in files
+        }
+
+    encoding = tiktoken.get_encoding("cl100k_base")
+
+    def encode(rel_path: str) -> int:
+        block, _, _ = render_file_block(repo_root, rel_path)
+        return len(encoding.encode(block, disallowed_special=()))
+
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            return dict(zip(files, pool.map(encode, files)))
+    return {f: encode(f) for f in files}
+
+
+def select_by_token_budget(
+    files: List[str], tokens: Dict[str, int], budget: int, priority: List[str], debug: bool
+) -> tuple[List[str], List[str]]:
+    """
+    Greedily fill `budget`, taking files that match earlier --priority patterns first and
+    otherwise going in path order. Files that do not fit are skipped, so smaller files
+    further down can still use up the remaining budget. Output order is unchanged.
+    """
+    def rank(rel_path: str) -> int:
+        for i, pattern in enumerate(priority):
+            if fnmatch.fnmatch(rel_path, pattern):
+                return i
+        return len(priority)
+
+    remaining = budget
+    selected = set()
+    for rel_path in sorted(files, key=lambda f: (rank(f), f)):
+        if tokens[rel_path] <= remaining:
+            remaining -= tokens[rel_path]
+            selected.add(rel_path)
+
+    kept = []
+    excluded = []
+    for rel_path in files:
+        if rel_path in selected:
+            kept.append(rel_path)
+        else:
+            excluded.append(f"{rel_path} [{tokens[rel_path]:,} tokens > remaining --token-budget]")
+            if debug:
+                print(f"❌ Excluded by --token-budget: {rel_path} ({tokens[rel_path]:,} tokens)")
+    return kept, excluded
+
+
+def print_token_histogram(files: List[str], tokens: Dict[str, int], budget: Optional[int]):
+    labels = []
+    lower = 0
+    for upper in TOKEN_HISTOGRAM_BUCKETS:
+        labels.append(f"{lower:>6,}–{upper - 1:<6,}")
+        lower = upper
+    labels.append(f"{lower:>6,}+      ")
+
+    counts = [0] * len(labels)
+    totals = [0] * len(labels)
+    for rel_path in files:
+        bucket = next((i for i, upper in enumerate(TOKEN_HISTOGRAM_BUCKETS) if tokens[rel_path] < upper), -1)
+        counts[bucket] += 1
+        totals[bucket] += tokens[rel_path]
+
+    total = sum(totals)
+    print(f"🔢 Tokens: {total:,}" + (f" / {budget:,} budget" if budget else ""))
+    widest = max(counts) or 1
+    for label, count, bucket_total in zip(labels, counts, totals):
+        bar = "█" * round(30 * count / widest)
+        print(f"   {label} {count:>7,} files {bucket_total:>12,} tokens {bar}")
+
+
 def human_readable_size(path: Path) -> str:
-    size = path.stat().st_size
+    return format_size(path.stat().st_size)
+
+
+def format_size(size: float) -> str:
     for unit in ["B", "KB", "MB", "GB"]:
         if size < 1024:
             return f"{size:.1f} {unit}"
@@ -97,36 +626,198 @@ def human_readable_size(path: Path) -> str:
     return f"{size:.1f} TB"
 
 
+class TeeWriter:
+    """Forward every write to several text streams, so one pass can feed multiple outputs."""
+
+    def __init__(self, *streams: TextIO):
+        self.streams = streams
+
+    def write(self, text: str) -> int:
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
+    def write_block(self, rel_path: str, block: str):
+        for stream in self.streams:
+            if hasattr(stream, "write_block"):
+                stream.write_block(rel_path, block)
+            else:
+                stream.write(block)
+
+
+class DumpWriter:
+    """
+    Write the aggregated document to one or more files in `output_dir`.
+
+    Blocks are stored as UTF-8, optionally compressed, and with a `chunk_size` they are
+    split at file boundaries into numbered parts of at most that many uncompressed bytes
+    (a single larger block gets a part to itself). With an index, one JSON line per block
+    records its part, its byte offset and length within the uncompressed part, and the
+    SHA-256 of its contents, so a reader can pull out one file without parsing the rest.
+    """
+
+    def __init__(
+        self, output_dir: Path, base_name: str, fmt: str, chunk_size: Optional[int], write_index: bool
+    ):
+        self.output_dir = output_dir
+        self.base_name = base_name
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.paths: List[Path] = []
+        self.part = None
+        self.part_bytes = 0
+        self.index_path = output_dir / f"{base_name}.index.jsonl" if write_index or chunk_size else None
+        self.index = self.index_path.open("w", encoding="utf-8") if self.index_path else None
+
+    def _open_part(self):
+        if self.part:
+            self.part.close()
+        suffix = f".part{len(self.paths) + 1:03d}" if self.chunk_size else ""
+        path = self.output_dir / f"{self.base_name}{suffix}.{self.fmt}"
+        if self.fmt == "md.gz":
+            self.part = gzip.open(path, "wb")
+        elif self.fmt == "md.zst":
+            self.part = zstandard.ZstdCompressor().stream_writer(path.open("wb", buffering=OUTPUT_BUFFER_SIZE))
+        else:
+            self.part = path.open("wb", buffering=OUTPUT_BUFFER_SIZE)
+        self.paths.append(path)
+        self.part_bytes = 0
+
+    def write_block(self, rel_path: str, block: str):
+        data = block.encode("utf-8")
+        if self.part is None or (
+            self.chunk_size and self.part_bytes and self.part_bytes + len(data) > self.chunk_size
+        ):
+            self._open_part()
+        if self.index:
+            entry = {
+                "path": rel_path,
+                "part": self.paths[-1].name,
+                "offset": self.part_bytes,
+                "length": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(),
+            }
+            self.index.write(json.dumps(entry) + "\n")
+        self.part.write(data)
+        self.part_bytes += len(data)
+
+    def close(self):
+        if self.part is None:
+            self._open_part()
+        self.part.close()
+        if self.index:
+            self.index.close()
+
+
+def render_file_block(repo_root: Path, rel_path: str) -> tuple[str, int, Optional[str]]:
+    """Read one file and return its Markdown block, line count and read error (if any)."""
+    full_path = repo_root / rel_path
+    ext = full_path.suffix.lstrip(".")
+    parts = [f"{rel_path}\n", f"```{ext}\n"]
+    line_count = 0
+    error = None
+    try:
+        with full_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                parts.append(line)
+                line_count += 1
+    except UnicodeDecodeError:
+        error = f"{rel_path} [non-UTF-8]"
+        parts.append("[Skipped non-UTF-8 file]\n")
+    except Exception as e:
+        error = f"{rel_path} [Error: {e}]"
+        parts.append(f"[Error reading file: {e}]\n")
+    parts.append("```\n\n")
+    return "".join(parts), line_count, error
+
+
+def iter_rendered_blocks(repo_root: Path, files: List[str], jobs: int, cache: Optional[BlockCache] = None):
+    """
+    Yield (rel_path, rendered block) in the order of `files`, reading up to `jobs` files at once.
+
+    Files read ahead of the writer are limited both in number and, by their size on disk, to
+    READ_AHEAD_BYTES; a file larger than that is only read once everything before it is written.
+    With a `cache`, unchanged files are served from it and every block is recorded for the next run.
+    """
+    def lookup(rel_path):
+        return cache.get(rel_path) if cache else None
+
+    if jobs <= 1:
+        for rel_path in files:
+            rendered = lookup(rel_path) or render_file_block(repo_root, rel_path)
+            if cache:
+                cache.put(rel_path, *rendered)
+            yield rel_path, rendered
+        return
+
+    def file_size(rel_path):
+        try:
+            return (repo_root / rel_path).stat().st_size
+        except OSError:
+            return 0
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        pending_bytes = 0
+
+        def take():
+            nonlocal pending_bytes
+            done_path, rendered, size = pending.popleft()
+            pending_bytes -= size
+            if not isinstance(rendered, tuple):
+                rendered = rendered.result()
+            if cache:
+                cache.put(done_path, *rendered)
+            return done_path, rendered
+
+        for rel_path in files:
+            rendered = lookup(rel_path)
+            if rendered:
+                size = len(rendered[0])
+            else:
+                size = file_size(rel_path)
+                while pending and pending_bytes + size > READ_AHEAD_BYTES:
+                    yield take()
+                rendered = pool.submit(render_file_block, repo_root, rel_path)
+            pending.append((rel_path, rendered, size))
+            pending_bytes += size
+            if len(pending) >= jobs * READ_AHEAD_PER_JOB:
+                yield take()
+        while pending:
+            yield take()
+
+
 def write_aggregate_markdown(
-    repo_root: Path, output_target, files: List[str], debug: bool
+    repo_root: Path,
+    output_target,
+    files: List[str],
+    debug: bool,
+    jobs: int = 1,
+    cache: Optional[BlockCache] = None,
 ) -> tuple[int, int, list[str]]:
     total_lines = 0
     errors = []
 
     if hasattr(output_target, "write"):
         out = output_target
+        close_after = False
     else:
-        out = output_target.open("w", encoding="utf-8")
+        out = output_target.open("w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+        close_after = True
 
-    for rel_path in files:
-        full_path = repo_root / rel_path
-        ext = full_path.suffix.lstrip(".")
+    for rel_path, (block, line_count, error) in iter_rendered_blocks(repo_root, files, jobs, cache):
         if debug:
             print(f"📄 Writing: {rel_path}")
-        out.write(f"{rel_path}\n")
-        out.write(f"```{ext}\n")
-        try:
-            with full_path.open("r", encoding="utf-8") as f:
-                for line in f:
-                    out.write(line)
-                    total_lines += 1
-        except UnicodeDecodeError:
-            errors.append(f"{rel_path} [non-UTF-8]")
-            out.write("[Skipped non-UTF-8 file]\n")
-        except Exception as e:
-            errors.append(f"{rel_path} [Error: {e}]")
-            out.write(f"[Error reading file: {e}]\n")
-        out.write("```\n\n")
+        if hasattr(out, "write_block"):
+            out.write_block(rel_path, block)
+        else:
+            out.write(block)
+        total_lines += line_count
+        if error:
+            errors.append(error)
+
+    if close_after:
+        out.close()
 
     return len(files), total_lines, errors
 
@@ -136,84 +827,402 @@ def main():
     Aggregates all Git-tracked, UTF-8-readable files in a project into a Markdown document.
 
     Exactly one of the following must be provided:
-    - --dir: The root directory of a Git project (uses `git ls-files` to get included files)
+    - --dir: The root directory of a project. Files come from `git ls-files` in a Git repository,
+      or from a directory walk that honours .gitignore files otherwise (see --enumerator)
     - --files: A list of specific files to include
 
     Output destinations:
     - --output-dir: Saves the output Markdown file to the specified directory
+      - --format: md (default), md.gz or md.zst (needs the zstandard package)
+      - --chunk-size: Splits the output at file boundaries into numbered parts of about this size
+      - --index: Writes a JSONL index (path, part, offset, length, sha256) next to the output
     - --to-clipboard: Copies the output to the system clipboard
+    - --stdout: Streams the output to stdout for piping (logs are sent to stderr)
+    - --watch: Keeps the rendered blocks in memory and rewrites the output file and/or clipboard
+      whenever files change, re-reading only the changed files (inotify if available, else polling)
+
+    Output is streamed file by file through a fixed-size write buffer. Each file is held in
+    memory as one block while it is written (and with --jobs, up to READ_AHEAD_BYTES of files
+    read ahead), so memory use grows with the largest file, not with the size of the project,
+    unless --to-clipboard is used without --output-dir.
 
     Other options:
     - --gitignore: Additional pathspec file (e.g. .llmignore) to exclude files
+    - --max-file-size: Skip files larger than this size (binary files are always skipped)
+    - --max-total-bytes: Skip files that would push the content past this size (smaller later files still fit)
+    - --token-budget: Fill a token budget greedily, honouring --priority globs, and print a token histogram
+    - --tokenizer: Count tokens with a size-based estimate (default) or tiktoken, if installed
+    - --jobs: Read files with N threads; output order and error handling are unchanged
+    - --enumerator: Force `git` (stream `git ls-files -z`) or `walk` (os.scandir) for --dir
+    - --cache: Keep rendered blocks on disk keyed by git blob id, so reruns only re-read changed files
+    - --cache-dir: Location of the --cache data (default: .git/aggregate-files-cache in the project,
+      or ~/.cache/aggregate-files outside Git repositories)
     - --debug: Enables detailed logging for file filtering and processing
     """
     args = parse_arguments()
-    print("📦 Starting file aggregation...")
+    stdout = sys.stdout
+    # With --stdout the aggregated document owns stdout, so progress logs move to stderr.
+    try:
+        with contextlib.redirect_stdout(sys.stderr if args.stdout else stdout):
+            aggregate(args, stdout)
+    except BrokenPipeError:
+        # The reader went away early (e.g. `| head`). Silence the flush at interpreter exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), stdout.fileno())
+        sys.exit(1)
+
 
+def enumerate_files(args: argparse.Namespace) -> tuple[Path, Iterable[str], Dict[str, Optional[str]]]:
+    """Resolve the project root and list its candidate files (possibly as a stream)."""
+    object_ids = {}
     if args.dir:
         project_root = Path(args.dir).resolve()
-        if not (project_root / ".git").is_dir():
-            print(f"❌ Error: {project_root} is not a Git repository.")
+        if not project_root.is_dir():
+            print(f"❌ Error: {project_root} is not a directory.")
             sys.exit(1)
-        if args.debug:
-            print(f"🔍 Scanning Git repo: {project_root}")
-        all_git_files = run_git_ls_files(project_root)
+        enumerator = args.enumerator
+        if enumerator == "auto":
+            enumerator = "git" if (project_root / ".git").exists() else "walk"
+        if enumerator == "git":
+            if not (project_root / ".git").exists():
+                print(f"❌ Error: {project_root} is not a Git repository.")
+                sys.exit(1)
+            if args.debug:
+                print(f"🔍 Scanning Git repo: {project_root}")
+            if args.cache:
+                object_ids = run_git_ls_files_stage(project_root)
+                all_files = iter(object_ids)
+            else:
+                all_files = iter_git_ls_files(project_root)
+        else:
+            if args.debug:
+                print(f"🔍 Walking directory (honouring .gitignore): {project_root}")
+            all_files = iter_scandir_files(project_root)
     else:
-        all_git_files = [str(Path(f).resolve()) for f in args.files]
-        project_root = Path(os.path.commonpath(all_git_files)).resolve()
+        all_files = [str(Path(f).resolve()) for f in args.files]
+        project_root = Path(os.path.commonpath(all_files)).resolve()
+    return project_root, all_files, object_ids
 
-    spec = load_pathspec(Path(args.gitignore), args.debug) if args.gitignore else None
-    final_files = filter_with_pathspec(all_git_files, spec, args.debug)
+
+def select_files(
+    args: argparse.Namespace, project_root: Path, all_files: Iterable[str], spec: Optional[CompiledIgnore]
+) -> tuple[List[str], List[str], Dict[str, int], Optional[Dict[str, int]]]:
+    """Apply the ignore file, prefilter and token budget. Returns (files, excluded, sizes, tokens)."""
+    final_files = filter_with_pathspec(all_files, spec, args.debug)
     final_files.sort()
+    final_files, excluded, sizes = prefilter_files(
+        project_root, final_files, args.max_file_size, args.max_total_bytes, args.debug, args.jobs
+    )
+
+    tokens = None
+    if args.token_budget is not None:
+        tokens = count_tokens(project_root, final_files, sizes, args.tokenizer, args.jobs)
+        final_files, over_budget = select_by_token_budget(
+            final_files, tokens, args.token_budget, args.priority, args.debug
+        )
+        excluded += over_budget
 
     if args.debug:
         print("\n🔎 Final included files:")
         for f in final_files:
-            full_path = project_root / f
-            size_kb = full_path.stat().st_size / 1024
-            print(f"  {f} — {size_kb:.1f} KB")
+            size = sizes.get(f)
+            print(f"  {f} — {size / 1024:.1f} KB" if size is not None else f"  {f} — unreadable")
 
-    buffer = StringIO()
-    file_count, line_count, errors = write_aggregate_markdown(project_root, buffer, final_files, args.debug)
-    text = buffer.getvalue()
-    
-    wrote_to_file = False
-    copied_to_clipboard = False
-    
+    return final_files, excluded, sizes, tokens
+
+
+def write_outputs(
+    args: argparse.Namespace,
+    stdout: TextIO,
+    project_root: Path,
+    final_files: List[str],
+    base_name: str,
+    cache,
+) -> tuple[int, int, List[str], Optional[DumpWriter], Optional[int]]:
+    """
+    Write the document to every requested destination in a single pass.
+
+    Returns (file count, line count, read errors, the DumpWriter used for --output-dir,
+    bytes copied to the clipboard or None).
+    """
+    streams = []
+
+    dump = None
     if args.output_dir:
         output_dir = Path(args.output_dir).resolve()
         output_dir.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        output_path = output_dir / f"{project_root.name}_{timestamp}.md"
-        output_path.write_text(text, encoding="utf-8")
-        wrote_to_file = True
-        size_str = human_readable_size(output_path)
-    
+        dump = DumpWriter(output_dir, base_name, args.format, args.chunk_size, args.index)
+        streams.append(dump)
+
+    if args.stdout:
+        streams.append(stdout)
+
+    # The clipboard needs the whole text at once. Only build it in memory when there is
+    # no plain, single output file to read it back from afterwards.
+    clipboard_buffer = None
+    if args.to_clipboard and (not args.output_dir or args.format != "md" or args.chunk_size):
+        clipboard_buffer = StringIO()
+        streams.append(clipboard_buffer)
+
+    file_count, line_count, errors = write_aggregate_markdown(
+        project_root, TeeWriter(*streams), final_files, args.debug, args.jobs, cache
+    )
+
+    if dump:
+        dump.close()
+
+    if args.stdout:
+        stdout.flush()
+
+    clipboard_size = None
     if args.to_clipboard:
+        text = clipboard_buffer.getvalue() if clipboard_buffer else dump.paths[0].read_text(encoding="utf-8")
         if pyperclip:
             try:
                 pyperclip.copy(text)
-                copied_to_clipboard = True
+                clipboard_size = len(text.encode("utf-8"))
             except Exception as e:
                 print(f"⚠️ Could not copy to clipboard: {e}")
         else:
             print("⚠️ pyperclip not installed. Output was not copied.")
-    
+
+    return file_count, line_count, errors, dump, clipboard_size
+
+
+class MemoryBlockCache:
+    """
+    In-memory block store used by --watch, keyed by each file's (mtime, size).
+
+    Shares the get/put interface of BlockCache, so a rebuild re-reads only the files
+    that changed and stitches the rest from memory.
+    """
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.entries: Dict[str, tuple[str, tuple[str, int, Optional[str]]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, rel_path: str) -> Optional[str]:
+        try:
+            st = (self.repo_root / rel_path).stat()
+        except OSError:
+            return None
+        return f"stat:{st.st_mtime_ns}:{st.st_size}"
+
+    def get(self, rel_path: str) -> Optional[tuple[str, int, Optional[str]]]:
+        entry = self.entries.get(rel_path)
+        if entry and entry[0] == self.key_for(rel_path):
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def put(self, rel_path: str, block: str, line_count: int, error: Optional[str]):
+        key = self.key_for(rel_path)
+        if key is not None:
+            self.entries[rel_path] = (key, (block, line_count, error))
+
+    def retain(self, files: List[str]):
+        keep = set(files)
+        self.entries = {f: entry for f, entry in self.entries.items() if f in keep}
+        self.hits = self.misses = 0
+
+
+def take_snapshot(repo_root: Path, files: List[str]) -> Dict[str, tuple[int, int]]:
+    """(mtime, size) of every file plus the mtime of each directory above them."""
+    snapshot = {}
+    directories = {""}
+    for rel_path in files:
+        try:
+            st = (repo_root / rel_path).stat()
+            snapshot[rel_path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            snapshot[rel_path] = (-1, -1)
+        parent = rel_path.rpartition("/")[0]
+        while parent not in directories:
+            directories.add(parent)
+            parent = parent.rpartition("/")[0]
+    for directory in directories:
+        try:
+            snapshot[directory + "/"] = ((repo_root / directory).stat().st_mtime_ns, 0)
+        except OSError:
+            snapshot[directory + "/"] = (-1, -1)
+    return snapshot
+
+
+def watch(
+    args: argparse.Namespace,
+    stdout: TextIO,
+    project_root: Path,
+    spec: Optional[CompiledIgnore],
+    final_files: List[str],
+    base_name: str,
+    cache: MemoryBlockCache,
+    dump: Optional[DumpWriter],
+):
+    """
+    Rebuild the outputs whenever a watched file changes, until interrupted.
+
+    inotify (via the optional inotify_simple package) wakes the loop on Linux; otherwise
+    the tree is polled every --watch-interval seconds. Changes are debounced, then a stat
+    snapshot tells which files changed. Only those are re-read; a changed directory (a
+    file was added, removed or renamed) also re-runs file selection. The outputs are
+    never watched, even when --output-dir is inside the tree, so a rebuild does not
+    trigger the next one.
+    """
+    debounce = WATCH_DEBOUNCE_SECONDS
+    notifier = inotify_simple.INotify() if inotify_simple else None
+    watch_flags = (
+        inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.MODIFY | inotify_simple.flags.CREATE
+        | inotify_simple.flags.DELETE | inotify_simple.flags.MOVED_FROM | inotify_simple.flags.MOVED_TO
+        if notifier else 0
+    )
+
+    def add_watches(snapshot):
+        for key in snapshot:
+            if key.endswith("/"):
+                try:
+                    notifier.add_watch(str(project_root / key.rstrip("/")), watch_flags)
+                except OSError:
+                    pass
+
+    # outputs are <base_name>*.<ext> in the output directory
+    output_prefix = None
+    if dump and dump.output_dir.is_relative_to(project_root):
+        output_dir = dump.output_dir.relative_to(project_root).as_posix()
+        output_dir = "" if output_dir == "." else output_dir
+        output_prefix = (output_dir + "/" if output_dir else "") + base_name
+
+    def without_outputs(files: List[str]) -> List[str]:
+        if output_prefix is None:
+            return files
+        return [f for f in files if not (f.startswith(output_prefix) and "/" not in f[len(output_prefix):])]
+
+    def wait_for_activity(timeout: float):
+        if notifier:
+            notifier.read(timeout=int(timeout * 1000))
+        else:
+            time.sleep(timeout)
+
+    final_files = without_outputs(final_files)
+    snapshot = take_snapshot(project_root, final_files)
+    if notifier:
+        add_watches(snapshot)
+    mode = "inotify" if notifier else f"polling every {args.watch_interval:g}s"
+    print(f"\n👀 Watching {len(final_files):,} files for changes ({mode}). Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            wait_for_activity(WATCH_IDLE_SECONDS if notifier else args.watch_interval)
+            current = take_snapshot(project_root, final_files)
+            if current == snapshot:
+                continue
+
+            # Let a burst of writes (save, formatter, git checkout) settle before rebuilding.
+            while True:
+                wait_for_activity(debounce)
+                settled = take_snapshot(project_root, final_files)
+                if settled == current:
+                    break
+                current = settled
+
+            started = time.perf_counter()
+            changed_dirs = any(k.endswith("/") and current[k] != snapshot.get(k) for k in current)
+            if changed_dirs:
+                with contextlib.redirect_stdout(StringIO()):
+                    _, all_files, _ = enumerate_files(args)
+                    final_files, _, _, _ = select_files(args, project_root, all_files, spec)
+                final_files = without_outputs(final_files)
+                current = take_snapshot(project_root, final_files)
+                if notifier:
+                    add_watches(current)
+            cache.retain(final_files)
+
+            previous_paths = set(dump.paths) if dump else set()
+            file_count, line_count, errors, dump, _ = write_outputs(
+                args, stdout, project_root, final_files, base_name, cache
+            )
+            for stale in previous_paths - set(dump.paths if dump else []):
+                stale.unlink(missing_ok=True)
+            if output_prefix is not None and output_dir + "/" in current:
+                # creating or removing parts touches the output directory, not the sources
+                current[output_dir + "/"] = ((project_root / output_dir).stat().st_mtime_ns, 0)
+            snapshot = current
+
+            elapsed = time.perf_counter() - started
+            print(
+                f"🔄 {datetime.now():%H:%M:%S} Rebuilt {file_count} files ({line_count:,} lines) in {elapsed:.2f}s: "
+                f"{cache.misses} re-read, {cache.hits} reused" + (f", {len(errors)} read errors" if errors else "")
+            )
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+    finally:
+        if notifier:
+            notifier.close()
+
+
+def aggregate(args: argparse.Namespace, stdout: TextIO):
+    print("📦 Starting file aggregation...")
+
+    project_root, all_files, object_ids = enumerate_files(args)
+    spec = load_pathspec(Path(args.gitignore), args.debug) if args.gitignore else None
+    final_files, excluded, sizes, tokens = select_files(args, project_root, all_files, spec)
+
+    cache = None
+    if args.watch:
+        cache = MemoryBlockCache(project_root)
+    elif args.cache:
+        if args.cache_dir:
+            cache_dir = Path(args.cache_dir).resolve()
+        elif (project_root / ".git").is_dir():
+            cache_dir = project_root / ".git" / "aggregate-files-cache"
+        else:
+            cache_dir = user_cache_path("blocks", project_root)
+        cache = BlockCache(cache_dir, project_root, object_ids)
+
+    base_name = f"{project_root.name}_{datetime.now():%Y-%m-%d_%H%M%S}"
+    file_count, line_count, errors, dump, clipboard_size = write_outputs(
+        args, stdout, project_root, final_files, base_name, cache
+    )
+
+    if isinstance(cache, BlockCache):
+        cache.save()
+
     # ✅ Unified log summary
     print(f"✅ Processed {file_count} files from {project_root}")
     print(f"📄 Total lines: {line_count:,}")
+
+    if tokens is not None:
+        print_token_histogram(final_files, tokens, args.token_budget)
+
+    if isinstance(cache, BlockCache):
+        print(f"♻️  Cache: {cache.hits} reused, {cache.misses} re-read")
     
-    if wrote_to_file:
-        print(f"📦 File size: {size_str}")
-        print(f"📁 Output: {output_path}")
+    if dump:
+        print(f"📦 File size: {format_size(sum(path.stat().st_size for path in dump.paths))}")
+        if len(dump.paths) == 1:
+            print(f"📁 Output: {dump.paths[0]}")
+        else:
+            print(f"📁 Output: {len(dump.paths)} parts, {dump.paths[0].name} … {dump.paths[-1].name} in {dump.output_dir}")
+        if dump.index_path:
+            print(f"🗂️  Index: {dump.index_path}")
     
-    if copied_to_clipboard:
-        size_kb = len(text.encode("utf-8")) / 1024
-        print(f"📋 Output copied to clipboard ({size_kb:.1f} KB)")
+    if clipboard_size is not None:
+        print(f"📋 Output copied to clipboard ({clipboard_size / 1024:.1f} KB)")
     
-    if not wrote_to_file and not copied_to_clipboard:
-        print("⚠️ No output location specified. Use --output-dir or --to-clipboard.")
+    if args.stdout:
+        print("📤 Output streamed to stdout")
+
+    if not dump and clipboard_size is None and not args.stdout:
+        print("⚠️ No output location specified. Use --output-dir, --to-clipboard or --stdout.")
     
+    if excluded:
+        print(f"🚫 Excluded {len(excluded)} binary, oversized or over-budget files without writing them")
+        if args.debug:
+            print("\n--- Excluded Files ---")
+            for item in excluded:
+                print(item)
+
     if errors:
         print(f"⚠️  Encountered {len(errors)} read errors")
         if args.debug:
@@ -221,5 +1230,8 @@ def main():
             for err in errors:
                 print(err)
 
+    if args.watch:
+        watch(args, stdout, project_root, spec, final_files, base_name, cache, dump)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# built-in dependencies
+import argparse
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def make_synthetic_tree(root: Path, file_count: int, seed: int = 0):
+    """Create `file_count` small .py/.js files, each with a few constants among ordinary code."""
+    rng = random.Random(seed)
+    for i in range(file_count):
+        ext = ".py" if i % 2 else ".js"
+        path = root / f"pkg{i % 100}" / f"mod{i % 2000}" / f"file_{i}{ext}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for _ in range(rng.randint(10, 80)):
+            if rng.random() < 0.1:
+                name = "".join(rng.choices(string.ascii_uppercase, k=6))
+                lines.append(f"{name}_{rng.randint(0, 50)} = {rng.randint(0, 1000)}")
+            else:
+                lines.append(f"value_{rng.randint(0, 10**6)} = compute({rng.random():.6f})")
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def main():
+    """
+    Benchmark extract-consts.py --jobs on a synthetic tree.
+
+    Usage:
+        python extract-consts-benchmark.py [--files 100000] [--jobs 1 2 4 8] [--tree DIR]
+
+    Each --jobs value runs the script end to end in a subprocess (output discarded).
+    """
+    parser = argparse.ArgumentParser(description="Benchmark extract-consts.py --jobs.")
+    parser.add_argument("--files", type=int, default=100_000, help="Number of synthetic files.")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4, 8], help="Process counts to compare.")
+    parser.add_argument("--tree", help="Scan this existing directory instead of building a synthetic tree.")
+    args = parser.parse_args()
+
+    script = Path(__file__).with_name("extract-consts.py")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.tree) if args.tree else Path(tmp)
+        if not args.tree:
+            print(f"🏗️  Building {args.files:,} synthetic files in {root}")
+            make_synthetic_tree(root, args.files)
+
+        print(f"⏱️  {script.name} on {root}")
+        baseline = None
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(script), str(root), ".py,.js", "--jobs", str(jobs)],
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"  --jobs {jobs:<3} {elapsed:8.2f} s  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,59 +1,245 @@
+import argparse
+import json
+import mmap
 import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 """
 Search a given directory and all subdirectories for specified file types, extract all SCREAMING_SNAKE_CASE
 constants along with their values, and print them alphabetically.
 
 Usage:
-    python script_name.py <root_directory> <file_extensions>
+    python script_name.py <root_directory> <file_extensions> [--jobs N] [--index FILE [--diff]]
 
 Arguments:
     - root_directory: The root directory to search.
     - file_extensions: Comma-separated list of file extensions to check, e.g. ".py,.js,.jsx".
+    - --jobs: Number of processes to scan files with (default: 1).
+    - --index: JSON file recording (constant, value, file, line), with files relative to
+      root_directory. Files whose mtime and size are unchanged since the last run are not rescanned.
+    - --diff: With --index, print the constants added, removed or changed since the last run
+      instead of the full list, and exit with status 1 if there are any.
 
 Functions:
+    - scan_constants(file_path): Extract constants, their values and line numbers from the specified file.
     - find_constants(file_path): Extract constants and their values from the specified file.
-    - main(directory, extensions): Search for constants in all specified file types within the given directory and print them.
+    - find_constants_batch(file_paths): Extract constants from a batch of files (one process pool task).
+    - update_index(files, index, jobs, directory): Rescan the files that changed since the index was written.
+    - diff_indexes(old, new): Compare the constants recorded in two indexes.
+    - main(directory, extensions, jobs, index_path, diff): Search for constants in all specified file types within the given directory and print them.
 """
+
+# Compiled once and run over the raw bytes of each file, so it works for any language
+# without decoding whole files. Values stop at the end of the line.
+CONSTANT_PATTERN = re.compile(rb'\b([A-Z][A-Z0-9_]{2,})\s*=\s*([^\r\n]*)')
+
+# Files per process pool task, so the per-task overhead is paid once per batch.
+BATCH_SIZE = 256
+
+# Minimum number of seconds between two progress line updates.
+PROGRESS_INTERVAL = 0.1
+
+# Bump when the index format or the constant pattern changes, to force a full rescan.
+INDEX_VERSION = 2
+
+def scan_constants(file_path):
+    """Extract all SCREAMING_SNAKE_CASE constants from a file as (name, value, line) tuples."""
+    with open(file_path, 'rb') as f:
+        try:
+            content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped
+            return []
+        with content:
+            constants = []
+            line, position = 1, 0
+            for match in CONSTANT_PATTERN.finditer(content):
+                line += content[position:match.start()].count(b'\n')
+                position = match.start()
+                name, value = match.groups()
+                constants.append((name.decode('ascii'), value.decode('utf-8', 'replace'), line))
+            return constants
+
 def find_constants(file_path):
     """Extract all SCREAMING_SNAKE_CASE constants from a file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-        pattern = r'\b([A-Z][A-Z0-9_]{2,})\s*=\s*(.*)'
-        matches = re.findall(pattern, content)
-        return set(matches)
+    return {(name, value) for name, value, _ in scan_constants(file_path)}
+
+def find_constants_batch(file_paths):
+    """Extract constants from a batch of files and return them as one set."""
+    constants = set()
+    for file_path in file_paths:
+        constants.update(find_constants(file_path))
+    return constants
+
+def scan_constants_batch(file_paths):
+    """Return {file_path: [(name, value, line), ...]} for a batch of files."""
+    return {file_path: scan_constants(file_path) for file_path in file_paths}
+
+def load_index(index_path):
+    """Load a constant index written by save_index, or an empty one."""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') == INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {'version': INDEX_VERSION, 'files': {}}
+
+def save_index(index_path, index):
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
 
-def main(directory, extensions):
+def update_index(files, index, jobs=1, directory='.'):
+    """
+    Return a new index for `files`, reusing entries of `index` whose mtime and size match.
+
+    Entries are keyed by path relative to `directory`, so the same tree given as `src` or
+    `./src` shares one index. Only new or changed files are scanned; files that no longer
+    exist are dropped.
+    """
+    entries = {}
+    stale = []
+    for file_path in files:
+        st = os.stat(file_path)
+        key = os.path.relpath(file_path, directory)
+        entry = index['files'].get(key)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            entries[key] = entry
+        else:
+            entries[key] = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'constants': []}
+            stale.append(file_path)
+
+    batches = [stale[i:i + BATCH_SIZE] for i in range(0, len(stale), BATCH_SIZE)]
+    done = 0
+    last_update = 0.0
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(scan_constants_batch, batch): len(batch) for batch in batches}
+            for future in as_completed(futures):
+                for file_path, constants in future.result().items():
+                    entries[os.path.relpath(file_path, directory)]['constants'] = constants
+                done += futures[future]
+                last_update = print_progress(done, len(stale), last_update)
+    else:
+        for batch in batches:
+            for file_path, constants in scan_constants_batch(batch).items():
+                entries[os.path.relpath(file_path, directory)]['constants'] = constants
+            done += len(batch)
+            last_update = print_progress(done, len(stale), last_update)
+    if stale:
+        sys.stderr.write('\n')
+    print(f"Rescanned {len(stale)} of {len(files)} files.", file=sys.stderr)
+
+    return {'version': INDEX_VERSION, 'files': entries}
+
+def diff_indexes(old, new):
+    """
+    Compare constants per (file, name, occurrence), so every definition of a name that is
+    assigned more than once in a file (e.g. in if/else branches) is compared with the one in
+    the same position. Returns sorted lists of added and removed (name, value, file, line)
+    tuples and changed (name, old_value, new_value, file, line) tuples.
+    """
+    def by_key(index):
+        constants = {}
+        for file_path, entry in index['files'].items():
+            occurrences = {}
+            for name, value, line in entry['constants']:
+                occurrence = occurrences[name] = occurrences.get(name, -1) + 1
+                constants[(file_path, name, occurrence)] = (value, line)
+        return constants
+
+    before, after = by_key(old), by_key(new)
+    added = sorted((name, value, f, line) for (f, name, n), (value, line) in after.items() if (f, name, n) not in before)
+    removed = sorted((name, value, f, line) for (f, name, n), (value, line) in before.items() if (f, name, n) not in after)
+    changed = sorted(
+        (name, before[(f, name, n)][0], value, f, line)
+        for (f, name, n), (value, line) in after.items()
+        if (f, name, n) in before and before[(f, name, n)][0] != value
+    )
+    return added, removed, changed
+
+def print_progress(done, total, last_update):
+    """
+    Rewrite the progress line on stderr if PROGRESS_INTERVAL has passed or everything is done;
+    return the time of the last update.
+    """
+    now = time.monotonic()
+    if done == total or now - last_update >= PROGRESS_INTERVAL:
+        progress = (done / total) * 100 if total else 100
+        sys.stderr.write(f'\rProgress: {progress:.2f}%')
+        sys.stderr.flush()
+        return now
+    return last_update
+
+def main(directory, extensions, jobs=1, index_path=None, diff=False):
     all_constants = set()
 
-    # Convert extensions to a set for faster lookup
-    ext_set = set(extensions.split(","))
+    # Convert extensions to a tuple for str.endswith
+    ext_tuple = tuple(set(extensions.split(",")))
 
     # Get a list of all files with specified extensions in the directory
-    files = [os.path.join(root, f) for root, _, files in os.walk(directory) for f in files if f.endswith(tuple(ext_set))]
+    files = [os.path.join(root, f) for root, _, files in os.walk(directory) for f in files if f.endswith(ext_tuple)]
+
+    if index_path:
+        old_index = load_index(index_path)
+        index = update_index(files, old_index, jobs, directory)
+        save_index(index_path, index)
 
-    total_files = len(files)
+        if diff:
+            added, removed, changed = diff_indexes(old_index, index)
+            print("Constant changes since last run:")
+            for const, value, file_path, line in added:
+                print(f'+ {const} = {value}  ({file_path}:{line})')
+            for const, value, file_path, line in removed:
+                print(f'- {const} = {value}  ({file_path}:{line})')
+            for const, old_value, value, file_path, line in changed:
+                print(f'~ {const} = {old_value} -> {value}  ({file_path}:{line})')
+            if not (added or removed or changed):
+                print("No changes.")
+            return 1 if added or removed or changed else 0
 
-    for idx, file_path in enumerate(files, 1):
-        constants = find_constants(file_path)
-        all_constants.update(constants)
+        for entry in index['files'].values():
+            all_constants.update((name, value) for name, value, _ in entry['constants'])
+    else:
+        total_files = len(files)
+        batches = [files[i:i + BATCH_SIZE] for i in range(0, total_files, BATCH_SIZE)]
+        done = 0
+        last_update = 0.0
 
-        progress = (idx / total_files) * 100
-        sys.stdout.write(f'\rProgress: {progress:.2f}%')
-        sys.stdout.flush()
+        if jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {pool.submit(find_constants_batch, batch): len(batch) for batch in batches}
+                for future in as_completed(futures):
+                    all_constants.update(future.result())
+                    done += futures[future]
+                    last_update = print_progress(done, total_files, last_update)
+        else:
+            for batch in batches:
+                all_constants.update(find_constants_batch(batch))
+                done += len(batch)
+                last_update = print_progress(done, total_files, last_update)
+        if total_files:
+            sys.stderr.write('\n')
 
     print("\nFound constants:")
     for const, value in sorted(all_constants):
         print(f'{const} = {value}')
+    return 0
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python script_name.py <root_directory> <file_extensions>")
-        sys.exit(1)
-
-    directory = sys.argv[1]
-    extensions = sys.argv[2]
-    main(directory, extensions)
-
+    parser = argparse.ArgumentParser(description="Extract SCREAMING_SNAKE_CASE constants from source files.")
+    parser.add_argument("directory", help="The root directory to search.")
+    parser.add_argument("extensions", help='Comma-separated list of file extensions, e.g. ".py,.js,.jsx".')
+    parser.add_argument("--jobs", type=int, default=1, help="Number of processes to scan files with (default: 1).")
+    parser.add_argument("--index", help="JSON index of constants per file, updated incrementally between runs.")
+    parser.add_argument("--diff", action="store_true", help="Report constants changed since the last --index run.")
+    args = parser.parse_args()
+    if args.diff and not args.index:
+        parser.error("--diff requires --index")
+    sys.exit(main(args.directory, args.extensions, args.jobs, args.index, args.diff))
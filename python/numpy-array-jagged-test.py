@@ -1,20 +1,18 @@
 import numpy as np
 
-def is_jagged(x):
-	return not (max([len(i) for i in x])==min([len(i) for i in x]))
+from ragged_arrays import JaggedArrayError, is_jagged, pad, to_csr
 
 if __name__ == "__main__":
 	a = np.array([np.array([1,2,3]),np.array([4,5,6])])
-	b = np.array([np.array([1,2,3]),np.array([4,5])])
+	b = np.array([np.array([1,2,3]),np.array([4,5])], dtype=object)
 	print(f'\na: {a}')
 	print(f'\nb: {b}')
 	print(f'\nIs a jagged? {is_jagged(a)}')
 	print(f'\nIs b jagged? {is_jagged(b)}')
-
-	class JaggedArrayError(Exception):
-		pass
+	print(f'\nb padded and transposed:\n{pad(b, fill_value=-1).T}')
+	print(f'\nb as CSR offsets and values: {to_csr(b)}')
 
 	try:
 		assert(not is_jagged(b))
 	except:
-		raise JaggedArrayError(f"Array dimensions are inconsistent - this will cause transposition to fail.")
\ No newline at end of file
+		raise JaggedArrayError(f"Array dimensions are inconsistent - this will cause transposition to fail.")
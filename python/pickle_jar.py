@@ -0,0 +1,257 @@
+#!/usr/bin/python
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from pickle_reader import pickle_reader, sidecar_paths
+
+JAR_DIRECTORY = './pickle_jar'
+INDEX_FILENAME = 'index.sqlite'
+
+def parse_size(value):
+	"""Parse a byte count such as `4096`, `512K`, `2M` or `10G` (binary units)."""
+	units = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+	value = value.strip().upper().removesuffix("B")
+	try:
+		if value and value[-1] in units:
+			return int(float(value[:-1]) * units[value[-1]])
+		return int(value)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+
+def dump_files(filename):
+	"""The .p file and its sidecars."""
+	return [filename] + sidecar_paths(filename)
+
+def describe_variable(variable):
+	"""(type, shape) of a variable as stored in the index; shape is None if it has none."""
+	variable_type = f"{type(variable).__module__}.{type(variable).__qualname__}"
+	shape = str(tuple(variable.shape)) if hasattr(variable, 'shape') else None
+	return variable_type, shape
+
+class PickleJar:
+	"""SQLite index of the dumps in a pickle jar, with retention and LRU eviction.
+
+	Every dump is one row of (filename, timestamp, caller, suffix, size, type, shape,
+	last_access), where filename is relative to the jar directory so the index works
+	from any working directory; rows returned by latest() and query() carry the full
+	path instead. Rows are inserted as dumps are written and only removed when the dump
+	is evicted. Lookups by caller (and suffix) go through B-tree indexes on
+	(caller, timestamp) and (caller, suffix, timestamp), so finding the latest dump is
+	O(log n) however many files the jar holds.
+
+	Retention limits are checked after every record(). Dumps older than max_age seconds
+	are removed first, then the least recently accessed dumps until the jar holds at most
+	max_count dumps and max_bytes bytes. last_access starts at the dump time and is
+	updated by open().
+
+	Example usage:
+		jar = PickleJar(max_bytes=parse_size("20G"), max_count=500)
+		variable = jar.open(jar.latest("train_step")["filename"])
+	"""
+
+	def __init__(self, directory=JAR_DIRECTORY, max_bytes=None, max_count=None, max_age=None):
+		os.makedirs(directory, exist_ok=True)
+		self.directory = os.path.abspath(directory)
+		self.max_bytes = max_bytes
+		self.max_count = max_count
+		self.max_age = max_age
+		# dumps may be recorded from pickle_quick_dump's background writer thread
+		self.lock = threading.Lock()
+		self.conn = sqlite3.connect(os.path.join(directory, INDEX_FILENAME), check_same_thread=False)
+		self.conn.row_factory = sqlite3.Row
+		with self.conn:
+			self.conn.execute(
+				"""CREATE TABLE IF NOT EXISTS dumps (
+					filename TEXT PRIMARY KEY, timestamp REAL, caller TEXT, suffix TEXT,
+					size INTEGER, type TEXT, shape TEXT, last_access REAL)"""
+			)
+			self.conn.execute("CREATE INDEX IF NOT EXISTS dumps_by_caller ON dumps (caller, timestamp)")
+			self.conn.execute("CREATE INDEX IF NOT EXISTS dumps_by_caller_suffix ON dumps (caller, suffix, timestamp)")
+			self.conn.execute("CREATE INDEX IF NOT EXISTS dumps_by_time ON dumps (timestamp)")
+			self.conn.execute("CREATE INDEX IF NOT EXISTS dumps_by_access ON dumps (last_access)")
+
+	def name(self, filename):
+		"""Index key of a dump: a bare file name is taken as in the jar, a path as given."""
+		if not os.path.dirname(filename):
+			return filename
+		return os.path.relpath(os.path.abspath(filename), self.directory)
+
+	def path(self, filename):
+		"""Absolute path of a dump given by index key or path."""
+		return os.path.join(self.directory, self.name(filename))
+
+	def _with_path(self, row):
+		row = dict(row)
+		row['filename'] = self.path(row['filename'])
+		return row
+
+	def record(self, filename, caller, suffix="", variable_type=None, shape=None, timestamp=None, size=None):
+		"""Add a dump written to filename to the index, then apply the retention limits.
+
+		variable_type and shape are as returned by describe_variable.
+		"""
+		timestamp = time.time() if timestamp is None else timestamp
+		if size is None:
+			size = sum(os.path.getsize(f) for f in dump_files(self.path(filename)))
+		with self.lock, self.conn:
+			self.conn.execute(
+				"INSERT OR REPLACE INTO dumps VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+				(self.name(filename), timestamp, caller, suffix, size, variable_type, shape, timestamp),
+			)
+		if self.max_bytes is not None or self.max_count is not None or self.max_age is not None:
+			self.enforce_retention()
+
+	def latest(self, caller, suffix=None, before=None):
+		"""The newest dump from caller (with suffix, if given), optionally older than before. None if there is none."""
+		query = "SELECT * FROM dumps WHERE caller = ?"
+		params = [caller]
+		if suffix is not None:
+			query += " AND suffix = ?"
+			params.append(suffix)
+		if before is not None:
+			query += " AND timestamp < ?"
+			params.append(before)
+		with self.lock:
+			row = self.conn.execute(query + " ORDER BY timestamp DESC LIMIT 1", params).fetchone()
+		return self._with_path(row) if row else None
+
+	def query(self, caller=None, suffix=None, since=None, until=None, limit=None):
+		"""Dumps matching all given filters, newest first."""
+		clauses, params = [], []
+		for clause, value in (("caller = ?", caller), ("suffix = ?", suffix),
+				("timestamp >= ?", since), ("timestamp < ?", until)):
+			if value is not None:
+				clauses.append(clause)
+				params.append(value)
+		query = "SELECT * FROM dumps"
+		if clauses:
+			query += " WHERE " + " AND ".join(clauses)
+		query += " ORDER BY timestamp DESC"
+		if limit is not None:
+			query += " LIMIT ?"
+			params.append(limit)
+		with self.lock:
+			return [self._with_path(row) for row in self.conn.execute(query, params)]
+
+	def open(self, filename, printout=False, mmap=True):
+		"""Load a dump with pickle_reader and mark it as recently used."""
+		variable = pickle_reader(self.path(filename), printout=printout, mmap=mmap)
+		with self.lock, self.conn:
+			self.conn.execute("UPDATE dumps SET last_access = ? WHERE filename = ?", (time.time(), self.name(filename)))
+		return variable
+
+	def evict(self, filename):
+		"""Delete a dump's files (the .p first, so a half-deleted dump is never loaded) and its row."""
+		for f in dump_files(self.path(filename)):
+			try:
+				os.remove(f)
+			except FileNotFoundError:
+				pass
+		self.forget(filename)
+
+	def forget(self, filename):
+		"""Drop a dump's row from the index, leaving its files alone."""
+		with self.lock, self.conn:
+			self.conn.execute("DELETE FROM dumps WHERE filename = ?", (self.name(filename),))
+
+	def enforce_retention(self, max_bytes=None, max_count=None, max_age=None):
+		"""Evict dumps beyond the given limits (default: the jar's own). Returns the evicted paths."""
+		max_bytes = self.max_bytes if max_bytes is None else max_bytes
+		max_count = self.max_count if max_count is None else max_count
+		max_age = self.max_age if max_age is None else max_age
+
+		cutoff = time.time() - max_age if max_age is not None else float('-inf')
+		with self.lock:
+			evicted = [row[0] for row in self.conn.execute("SELECT filename FROM dumps WHERE timestamp < ?", (cutoff,))]
+			count, total = self.conn.execute(
+				"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM dumps WHERE timestamp >= ?", (cutoff,)
+			).fetchone()
+			over_limit = lambda: (max_count is not None and count > max_count) or (max_bytes is not None and total > max_bytes)
+			if over_limit():
+				for row in self.conn.execute("SELECT filename, size FROM dumps WHERE timestamp >= ? ORDER BY last_access", (cutoff,)):
+					evicted.append(row['filename'])
+					count -= 1
+					total -= row['size']
+					if not over_limit():
+						break
+
+		for filename in evicted:
+			self.evict(filename)
+		return [self.path(filename) for filename in evicted]
+
+	def reindex(self):
+		"""Add .p files that are in the directory but not in the index, and drop rows whose file is gone.
+
+		This is the one operation that scans the directory. It never deletes files: rows
+		without a file are only forgotten. The caller and suffix of an unindexed dump
+		cannot be told apart from its file name, so the whole name after the time is
+		stored as the caller.
+		"""
+		with self.lock:
+			indexed = {row[0] for row in self.conn.execute("SELECT filename FROM dumps")}
+		on_disk = {name for name in os.listdir(self.directory) if name.endswith('.p')}
+		for filename in indexed - on_disk:
+			if not os.path.exists(self.path(filename)):
+				self.forget(filename)
+		added = 0
+		for filename in sorted(on_disk - indexed):
+			stem = filename[:-len('.p')]
+			try:
+				timestamp = datetime.strptime(stem[:15], '%Y%m%d_%H%M%S').timestamp()
+				caller = stem[16:]
+			except ValueError:
+				timestamp, caller = os.path.getmtime(self.path(filename)), stem
+			variable_type, shape = describe_variable(pickle_reader(self.path(filename), mmap=True))
+			self.record(filename, caller, "", variable_type, shape, timestamp)
+			added += 1
+		return added
+
+def format_row(row):
+	when = datetime.fromtimestamp(row['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+	shape = f" {row['shape']}" if row['shape'] else ""
+	return f"{when}  {row['size']:>14,}  {row['type']}{shape}  {row['filename']}"
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description='Query and prune the pickle jar written by pickle_quick_dump')
+	parser.add_argument('--jar', default=JAR_DIRECTORY, help=f'jar directory (default: {JAR_DIRECTORY})')
+	subparsers = parser.add_subparsers(dest='command', required=True)
+
+	latest_parser = subparsers.add_parser('latest', help='print the path of the newest dump from a function')
+	latest_parser.add_argument('caller', help='name of the function that called pickle_quick_dump')
+	latest_parser.add_argument('--suffix', help='only dumps with this suffix')
+	latest_parser.add_argument('--show', action='store_true', help='print the dump with pickle_reader')
+
+	list_parser = subparsers.add_parser('list', help='list dumps, newest first')
+	list_parser.add_argument('--caller', help='only dumps from this function')
+	list_parser.add_argument('--suffix', help='only dumps with this suffix')
+	list_parser.add_argument('--limit', type=int, help='at most this many dumps')
+
+	prune_parser = subparsers.add_parser('prune', help='evict dumps beyond the given limits')
+	prune_parser.add_argument('--max-bytes', type=parse_size, help='total size to keep, e.g. 20G')
+	prune_parser.add_argument('--max-count', type=int, help='number of dumps to keep')
+	prune_parser.add_argument('--max-age', type=float, help='evict dumps older than this many seconds')
+
+	subparsers.add_parser('reindex', help='index dumps written before the index existed')
+
+	args = parser.parse_args()
+	jar = PickleJar(args.jar)
+	if args.command == 'latest':
+		row = jar.latest(args.caller, args.suffix)
+		if row is None:
+			parser.exit(1, f'No dumps from {args.caller}\n')
+		print(row['filename'])
+		if args.show:
+			jar.open(row['filename'], printout=True)
+	elif args.command == 'list':
+		for row in jar.query(args.caller, args.suffix, limit=args.limit):
+			print(format_row(row))
+	elif args.command == 'prune':
+		for filename in jar.enforce_retention(args.max_bytes, args.max_count, args.max_age):
+			print(f'Evicted {filename}')
+	elif args.command == 'reindex':
+		print(f'Indexed {jar.reindex()} dumps')
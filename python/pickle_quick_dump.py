@@ -1,14 +1,130 @@
-from inspect import stack
+import atexit
+import pickle
+import queue
+import sys
+import threading
 from datetime import datetime
-from pickle import dump
 from os import path
 from os import makedirs
+from os import remove
+from os import replace
 
-def pickle_quick_dump(variable, suffix=""):
-	if not path.exists('pickle_jar'):
-		makedirs('pickle_jar')
+from pickle_jar import JAR_DIRECTORY, PickleJar, describe_variable
+from pickle_reader import sidecar_path, sidecar_paths
+
+# dumps waiting for the background writer before pickle_quick_dump blocks
+BACKGROUND_QUEUE_SIZE = 4
+# retention limits of the jar, applied after every dump (see PickleJar). Set them
+# before the first dump, e.g. RETENTION['max_bytes'] = 20 * 1024**3
+RETENTION = {'max_bytes': None, 'max_count': None, 'max_age': None}
+
+_jar = None
+_writer_queue = None
+_writer_errors = []
+_writer_lock = threading.Lock()
+
+def npy_header(nbytes):
+	"""Header of a version 1.0 .npy file holding nbytes raw bytes as a flat uint8 array."""
+	header = "{'descr': '|u1', 'fortran_order': False, 'shape': (%d,), }" % nbytes
+	# magic (6) + version (2) + header length (2) + header + newline, padded to 64 bytes
+	padding = -(10 + len(header) + 1) % 64
+	header = (header + ' ' * padding + '\n').encode('latin1')
+	return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header
+
+def get_pickle_jar():
+	"""The PickleJar index of JAR_DIRECTORY that dumps are recorded in."""
+	global _jar
+	with _writer_lock:
+		if _jar is None:
+			_jar = PickleJar(JAR_DIRECTORY, **RETENTION)
+	return _jar
+
+def write_dump(filename, data, buffers):
+	"""Write the sidecars, then the pickle stream, so an existing .p always has its buffers.
+
+	Sidecars left past the new ones by an earlier dump to the same file are removed.
+	Returns the number of bytes written.
+	"""
+	size = len(data)
+	for index, buffer in enumerate(buffers):
+		raw = buffer.raw() if isinstance(buffer, pickle.PickleBuffer) else buffer
+		header = npy_header(len(raw))
+		with open(sidecar_path(filename, index), 'wb') as sidecar:
+			sidecar.write(header)
+			sidecar.write(raw)
+		size += len(header) + len(raw)
+	for stale in sidecar_paths(filename)[len(buffers):]:
+		remove(stale)
+	with open(filename + '.tmp', 'wb') as pickle_file:
+		pickle_file.write(data)
+	replace(filename + '.tmp', filename)
+	return size
+
+def write_and_record(filename, data, buffers, record):
+	"""write_dump, then add the dump to the jar index. record holds PickleJar.record's arguments."""
+	size = write_dump(filename, data, buffers)
+	get_pickle_jar().record(filename, size=size, **record)
+
+def _background_writer():
+	while True:
+		filename, data, buffers, record = _writer_queue.get()
+		try:
+			write_and_record(filename, data, buffers, record)
+		except Exception as error:
+			_writer_errors.append((filename, error))
+		finally:
+			_writer_queue.task_done()
+
+def flush_pickle_jar():
+	"""Wait until all background dumps are on disk. Raises the first error a background write hit."""
+	if _writer_queue is not None:
+		_writer_queue.join()
+	if _writer_errors:
+		filename, error = _writer_errors[0]
+		del _writer_errors[:]
+		raise OSError(f'Background dump of {filename} failed') from error
+
+def _start_writer():
+	global _writer_queue
+	with _writer_lock:
+		if _writer_queue is None:
+			_writer_queue = queue.Queue(maxsize=BACKGROUND_QUEUE_SIZE)
+			threading.Thread(target=_background_writer, name='pickle_quick_dump', daemon=True).start()
+			atexit.register(flush_pickle_jar)
+
+def pickle_quick_dump(variable, suffix="", background=False):
+	"""Pickle variable into ./pickle_jar/<date>_<time>_<caller>[_suffix].p
+
+	Uses pickle protocol 5. Buffers that support out-of-band pickling, such as the data
+	of contiguous NumPy arrays, are not copied into the pickle stream: each one is
+	written as-is to a .npy sidecar next to the .p file (<name>.p.0.npy, ...).
+	Use pickle_reader to load the dump with its sidecars. Every dump is recorded in the
+	jar's index (see pickle_jar.PickleJar), which applies the RETENTION limits.
+
+	Parameters:
+		variable (any picklable object): what to dump.
+		suffix (str): appended to the file name.
+		background (bool): hand the write to a background thread and return at once.
+			The array data is copied first, so the caller may keep modifying it.
+			Call flush_pickle_jar to wait for pending writes (done at exit too).
+
+	Returns:
+		filename (str): path of the .p file.
+	"""
+	if not path.exists(JAR_DIRECTORY):
+		makedirs(JAR_DIRECTORY, exist_ok=True)
+	record = {'caller': sys._getframe(1).f_code.co_name, 'suffix': suffix}
 	if suffix != "": suffix = "_"+suffix
-	caller_function_name = stack()[1].function
-	filename="./pickle_jar/"+datetime.now().strftime('%Y%m%d_%H%M%S_')+caller_function_name+suffix+".p"
-	dump(variable,open(filename,"wb"))
-	return
\ No newline at end of file
+	now = datetime.now()
+	filename=JAR_DIRECTORY+"/"+now.strftime('%Y%m%d_%H%M%S_')+record['caller']+suffix+".p"
+	record['variable_type'], record['shape'] = describe_variable(variable)
+	record['timestamp'] = now.timestamp()
+
+	buffers = []
+	data = pickle.dumps(variable, protocol=5, buffer_callback=buffers.append)
+	if background:
+		_start_writer()
+		_writer_queue.put((filename, data, [bytes(buffer.raw()) for buffer in buffers], record))
+	else:
+		write_and_record(filename, data, buffers, record)
+	return filename
@@ -6,30 +6,114 @@ version on your environment's $PATH. Used for unix-based operating systems.
 '''
 
 import argparse
+import os
 import pickle
+import reprlib
 import numpy
 
-def pickle_reader(filename, printout=False):
+# out-of-band buffer n of <name>.p is stored as <name>.p.<n>.npy (written by pickle_quick_dump)
+SIDECAR_FORMAT = '{}.{}.npy'
+# rows (or items) printed from each end of a variable
+HEAD_ROWS = 5
+# summary stats of larger arrays are computed from this many elements, read in
+# STATS_BLOCKS evenly spaced contiguous blocks so only those pages are touched
+STATS_SAMPLE_SIZE = 65536
+STATS_BLOCKS = 16
 
+def sidecar_path(filename, index):
+	return SIDECAR_FORMAT.format(filename, index)
+
+def sidecar_paths(filename):
+	"""Paths of the sidecars of filename that exist, in buffer order."""
+	paths = []
+	while os.path.exists(sidecar_path(filename, len(paths))):
+		paths.append(sidecar_path(filename, len(paths)))
+	return paths
+
+def load_sidecars(filename, mmap_mode=None):
+	"""Return the out-of-band buffers written next to filename by pickle_quick_dump, in order.
+
+	With mmap_mode='r' the buffers are memory-mapped instead of read.
+	"""
+	return [numpy.load(path, mmap_mode=mmap_mode) for path in sidecar_paths(filename)]
+
+def describe(variable):
+	"""One line with the type, and shape, dtype and size where the variable has them."""
+	details = [type(variable).__name__]
+	if hasattr(variable, 'shape'):
+		details.append(f'shape {variable.shape}')
+	if hasattr(variable, 'dtype'):
+		details.append(f'dtype {variable.dtype}')
+	if isinstance(variable, numpy.ndarray):
+		details.append(f'{variable.nbytes:,} bytes')
+	elif hasattr(variable, '__len__'):
+		details.append(f'len {len(variable):,}')
+	return ', '.join(details)
+
+def sample_stats(array):
+	"""min, max and mean of a numeric array, from a bounded sample if it is large."""
+	flat = array.reshape(-1, order='A')
+	if flat.size <= STATS_SAMPLE_SIZE:
+		sample, note = flat, ''
+	else:
+		block = STATS_SAMPLE_SIZE // STATS_BLOCKS
+		starts = numpy.linspace(0, flat.size - block, STATS_BLOCKS, dtype=numpy.int64)
+		sample = numpy.concatenate([flat[start:start + block] for start in starts])
+		note = f' (sampled {sample.size:,} of {flat.size:,} elements)'
+	return f'min {sample.min()}, max {sample.max()}, mean {sample.mean()}{note}'
+
+def print_summary(variable, rows=HEAD_ROWS):
+	"""Print the type, shape, dtype and size of variable with a bounded head and tail."""
+	print(f'\nType: {describe(variable)}')
+
+	if isinstance(variable, numpy.ndarray):
+		# array2string only reads the edge items of arrays above the threshold
+		print('\nContents: ')
+		print(numpy.array2string(variable, threshold=2 * rows, edgeitems=rows))
+		if variable.size and (numpy.issubdtype(variable.dtype, numpy.number) or variable.dtype == bool):
+			print(f'\nStats: {sample_stats(variable)}')
+	elif hasattr(variable, 'head') and hasattr(variable, 'tail'):
+		print(f'\nHead: \n{variable.head(rows)}')
+		print(f'\nTail: \n{variable.tail(rows)}')
+	elif isinstance(variable, dict):
+		print('\nContents: ')
+		for key in list(variable)[:2 * rows]:
+			print(f'  {key!r}: {describe(variable[key])}')
+		if len(variable) > 2 * rows:
+			print(f'  ... {len(variable) - 2 * rows:,} more')
+	elif isinstance(variable, (list, tuple)):
+		print('\nContents: ')
+		for index, row in enumerate(variable):
+			if rows <= index < len(variable) - rows:
+				continue
+			print(f'  [{index}] {describe(row)}: {reprlib.repr(row)}')
+			if index == rows - 1 and len(variable) > 2 * rows:
+				print(f'  ... {len(variable) - 2 * rows:,} more')
+	else:
+		print(f'\nContents: \n{reprlib.repr(variable)}')
+
+def pickle_reader(filename, printout=False, mmap=False, rows=HEAD_ROWS):
+	"""Load a pickle file, with the .npy sidecars written by pickle_quick_dump if it has any.
+
+	Parameters:
+		filename (str): path to the .p file.
+		printout (bool): print a bounded summary of the loaded variable.
+		mmap (bool): memory-map the sidecars instead of reading them. Arrays backed by
+			them are then read-only and only paged in as they are accessed, so a dump
+			of any size loads in milliseconds. Pickles without sidecars are always
+			read in full.
+		rows (int): rows printed from the head and tail of the variable.
+
+	Returns:
+		the unpickled variable.
+	"""
+	buffers = load_sidecars(filename, mmap_mode='r' if mmap else None)
 	with open(filename, 'rb') as pickle_file:
-		pickled_variable = pickle.load(pickle_file)
+		pickled_variable = pickle.load(pickle_file, buffers=buffers)
 
 	if printout:
-		print(f'\nLoaded {filename}.')
-
-		try:
-			print(f'\nType: {type(pickled_variable)}')
-			print(f'\nDimensions {pickled_variable.shape}')
-		except:
-			pass
-		try:
-			print(f'\nContents: ')
-			for row in pickled_variable: 
-				print("\n",row)
-				print("Type: ",type(row))
-				print("Contains: ",type(row[0]),"(based on 0th element)")
-		except:
-			print(pickled_variable)
+		print(f'\nLoaded {filename}' + (f' ({len(buffers)} memory-mapped sidecars).' if mmap and buffers else '.'))
+		print_summary(pickled_variable, rows)
 
 	return(pickled_variable)
 
@@ -37,6 +121,10 @@ if __name__ == "__main__":
 	parser = argparse.ArgumentParser(description='Open a Python "Pickle" file, print variable TYPE and CONTENTS')
 	parser.add_argument('filename', type=str, nargs='+',
 	                   help='path to pickle file')
+	parser.add_argument('--rows', type=int, default=HEAD_ROWS,
+	                   help=f'rows to print from the head and tail (default: {HEAD_ROWS})')
+	parser.add_argument('--no-mmap', action='store_true',
+	                   help='read sidecars into memory instead of memory-mapping them')
 	args = parser.parse_args()
 	filename = args.filename[0]
-	pickle_reader(filename, printout=True)
\ No newline at end of file
+	pickle_reader(filename, printout=True, mmap=not args.no_mmap, rows=args.rows)
@@ -0,0 +1,194 @@
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+class JaggedArrayError(ValueError):
+	"""Raised when rows that must have equal lengths do not."""
+
+_OBJECT = np.dtype(object)
+_dtype = attrgetter('dtype')
+_ndim = attrgetter('ndim')
+_shape = attrgetter('shape')
+
+def _is_numeric_array(x):
+	return isinstance(x, np.ndarray) and x.dtype != _OBJECT
+
+def _is_sequence(x):
+	return hasattr(x, '__len__') and not isinstance(x, (str, bytes))
+
+def _check_level(rows):
+	"""Row by row check of one level with scalars, strings or other types mixed in.
+
+	Returns (jagged, rows of the next level).
+	"""
+	length = missing = object()
+	children = []
+	for row in rows:
+		if _is_numeric_array(row):
+			row_length = len(row) if row.ndim else None
+			# all sub-rows of a numeric array share one shape: one stands in for all
+			if row.ndim > 1 and len(row):
+				children.append(row[0])
+		elif _is_sequence(row):
+			row_length = len(row)
+			children.extend(row)
+		else:
+			row_length = None
+		if length is missing:
+			length = row_length
+		elif row_length != length:
+			return True, None
+	return False, children
+
+def is_jagged(x, depth=None):
+	"""Returns True if rows at some nesting level of x have different lengths.
+
+	x may be a list, tuple, object array or generator of rows; rows may be lists,
+	arrays or further nested rows. Each level is checked with one C-level pass per
+	property (type, len, and dtype/ndim for arrays) instead of interpreted loops; only
+	levels mixing in scalars or other types fall back to a row by row check. A numeric
+	(non-object) array is rectangular by construction, so its shape is compared instead
+	of descending into it. depth=1 compares row lengths only, like the original check.
+
+	Parameters:
+		x (iterable): rows to check. A generator is consumed.
+		depth (int): number of nesting levels to check (default: all).
+
+	Returns:
+		(bool): whether x is jagged.
+
+	Example usage:
+		>>> is_jagged([np.array([1, 2, 3]), np.array([4, 5])])
+		True
+		>>> is_jagged([[[1, 2], [3, 4]], [[5, 6], [7]]], depth=1)
+		False
+	"""
+	rows = x if _is_sequence(x) else list(x)
+	while rows is not None and len(rows) and (depth is None or depth > 0):
+		if _is_numeric_array(rows):
+			return False
+		types = set(map(type, rows))
+		sequences = all(issubclass(t, (list, tuple, np.ndarray)) for t in types)
+		if sequences and any(issubclass(t, np.ndarray) for t in types):
+			# 0-d arrays have no len(), so a level holding any goes row by row
+			if all(issubclass(t, np.ndarray) for t in types):
+				sequences = 0 not in set(map(_ndim, rows))
+			else:
+				sequences = all(getattr(row, 'ndim', 1) for row in rows)
+		if not sequences:
+			jagged, rows = _check_level(rows)
+			if jagged:
+				return True
+		else:
+			if len(set(map(len, rows))) > 1:
+				return True
+			if depth is not None and depth == 1:
+				return False
+			if all(issubclass(t, np.ndarray) for t in types) and _OBJECT not in set(map(_dtype, rows)):
+				ndims = set(map(_ndim, rows))
+				if ndims == {1}:
+					return False
+				if len(ndims) > 1:
+					return True
+				# equal lengths, so only the inner dimensions left within depth can differ
+				shapes = set(map(_shape, rows))
+				return len({shape[1:depth] if depth else shape for shape in shapes}) > 1
+			rows = list(chain.from_iterable(rows))
+		if depth is not None:
+			depth -= 1
+	return False
+
+def to_csr(x, dtype=None):
+	"""Converts rows of different lengths into (offsets, values) arrays, CSR style.
+
+	Row i is values[offsets[i]:offsets[i + 1]]. Both are plain numeric arrays, so
+	jagged data can be processed without an object array. x is read in one pass and
+	may be a generator.
+
+	Parameters:
+		x (iterable of 1-D arrays or sequences): the rows.
+		dtype (numpy dtype): type of values (default: inferred from the rows). Lists
+			of Python numbers convert faster when it is given.
+
+	Returns:
+		offsets (int64 array of len(x) + 1), values (1-D array).
+
+	Example usage:
+		>>> to_csr([[1, 2, 3], [4, 5]])
+		(array([0, 3, 5]), array([1, 2, 3, 4, 5]))
+	"""
+	rows = x if isinstance(x, (list, tuple, np.ndarray)) else list(x)
+	lengths = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+	offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+	np.cumsum(lengths, out=offsets[1:])
+
+	if not len(rows):
+		values = np.array([], dtype=dtype)
+	elif not isinstance(rows[0], np.ndarray):
+		if dtype is not None:
+			values = np.fromiter(chain.from_iterable(rows), dtype=dtype, count=offsets[-1])
+		else:
+			values = np.array(list(chain.from_iterable(rows)))
+	else:
+		values = np.concatenate(rows)
+		if dtype is not None:
+			values = values.astype(dtype, copy=False)
+	return offsets, values
+
+def from_csr(offsets, values):
+	"""Returns the rows of a CSR (offsets, values) pair as a list of views into values."""
+	return np.split(values, offsets[1:-1])
+
+def _padded_dtype(dtype, fill_value):
+	"""dtype, or a wider one if fill_value cannot be stored in it exactly (e.g. NaN in integers)."""
+	fill = np.asarray(fill_value)
+	try:
+		with np.errstate(all='ignore'):
+			if fill.astype(dtype) == fill:
+				return dtype
+	except (TypeError, ValueError):
+		pass
+	return np.result_type(dtype, np.min_scalar_type(fill_value))
+
+def csr_to_padded(offsets, values, fill_value=0, width=None):
+	"""Pads the rows of a CSR (offsets, values) pair into a rectangular 2-D array.
+
+	Parameters:
+		fill_value (scalar): value of the padding.
+		width (int): number of columns (default: the longest row). Longer rows are truncated.
+
+	Returns:
+		(2-D array): one row per CSR row, with the dtype of values, widened only if
+		fill_value cannot be stored in it (e.g. NaN padding of integers).
+	"""
+	lengths = np.diff(offsets)
+	width = int(lengths.max(initial=0)) if width is None else width
+	dtype = _padded_dtype(values.dtype, fill_value)
+	padded = np.full((len(lengths), width), fill_value, dtype=dtype)
+	mask = np.arange(width) < lengths[:, None]
+	if width < lengths.max(initial=0):
+		# keep only the first width values of each row
+		column = np.arange(len(values)) - np.repeat(offsets[:-1], lengths)
+		padded[mask] = values[column < width]
+	else:
+		padded[mask] = values
+	return padded
+
+def pad(x, fill_value=0, width=None, dtype=None):
+	"""Pads rows of different lengths into a rectangular 2-D array (e.g. so it can be transposed).
+
+	Example usage:
+		>>> pad([np.array([1, 2, 3]), np.array([4, 5])], fill_value=-1)
+		array([[ 1,  2,  3],
+		       [ 4,  5, -1]])
+	"""
+	offsets, values = to_csr(x, dtype)
+	return csr_to_padded(offsets, values, fill_value, width)
+
+def as_rectangular(x, dtype=None):
+	"""Converts x to a numeric array, raising JaggedArrayError instead of building an object array."""
+	rows = x if _is_sequence(x) else list(x)
+	if is_jagged(rows):
+		raise JaggedArrayError("Array dimensions are inconsistent - this will cause transposition to fail.")
+	return np.asarray(rows, dtype=dtype)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+# built-in dependencies
+import argparse
+import time
+
+# external dependencies
+import numpy as np
+
+from ragged_arrays import is_jagged, pad, to_csr
+
+
+def legacy_is_jagged(x):
+    """is_jagged as it was in numpy-array-jagged-test.py, for comparison."""
+    return not (max([len(i) for i in x]) == min([len(i) for i in x]))
+
+
+def loop_pad(x, fill_value=0):
+    """Pad with a Python loop over the rows, for comparison."""
+    width = max(len(row) for row in x)
+    padded = np.full((len(x), width), fill_value, dtype=np.asarray(x[0]).dtype)
+    for i, row in enumerate(x):
+        padded[i, : len(row)] = row
+    return padded
+
+
+def make_rows(elements: int, mean_length: int, seed: int = 0):
+    """1-D int64 arrays of random lengths in [0, 2 * mean_length) adding up to about `elements`."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(0, 2 * mean_length, size=elements // mean_length)
+    values = rng.integers(0, 256, size=int(lengths.sum()))
+    return np.split(values, np.cumsum(lengths)[:-1])
+
+
+def timed(label: str, run, baseline: float | None = None):
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    speedup = f"  ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<40} {elapsed:8.3f} s{speedup}")
+    return elapsed, result
+
+
+def main():
+    """
+    Benchmark ragged_arrays.py on ragged inputs.
+
+    Usage:
+        python ragged_arrays_benchmark.py [--elements 10000000] [--mean-length 10]
+
+    Inputs are a list of NumPy arrays, the same rows as an object array, and as Python
+    lists. Detection is timed on rectangular data (the worst case: every row is read)
+    and on data whose last row alone is shorter. depth=1 checks row lengths only, like
+    the legacy function; the default also checks the dtype and ndim of every row.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark ragged_arrays.py.")
+    parser.add_argument("--elements", type=int, default=10_000_000, help="Total number of values.")
+    parser.add_argument("--mean-length", type=int, default=10, help="Mean row length.")
+    args = parser.parse_args()
+
+    rows = make_rows(args.elements, args.mean_length)
+    object_rows = np.empty(len(rows), dtype=object)
+    object_rows[:] = rows
+    list_rows = [row.tolist() for row in rows]
+    total = sum(len(row) for row in rows)
+    print(f"🏗️  {len(rows):,} rows, {total:,} values")
+
+    rectangular = [np.zeros(args.mean_length, dtype=np.int64)] * len(rows)
+    last_short = rectangular[:-1] + [np.zeros(args.mean_length - 1, dtype=np.int64)]
+    for label, data in (("rectangular", rectangular), ("last row short", last_short)):
+        print(f"⏱️  is_jagged, {label}")
+        baseline, expected = timed("legacy is_jagged", lambda: legacy_is_jagged(data))
+        _, shallow = timed("is_jagged(depth=1)", lambda: is_jagged(data, depth=1), baseline)
+        _, result = timed("is_jagged", lambda: is_jagged(data), baseline)
+        _, from_generator = timed("is_jagged (generator)", lambda: is_jagged(row for row in data), baseline)
+        assert shallow == result == expected == from_generator
+
+    print("⏱️  to_csr")
+    for label, data, dtype in (
+        ("list of arrays", rows, None),
+        ("object array", object_rows, None),
+        ("generator of arrays", (row for row in rows), None),
+        ("list of lists", list_rows, None),
+        ("list of lists, dtype=int64", list_rows, np.int64),
+    ):
+        _, (offsets, values) = timed(label, lambda: to_csr(data, dtype))
+        assert offsets[-1] == len(values) == total
+
+    print("⏱️  pad")
+    baseline, expected = timed("Python loop", lambda: loop_pad(rows))
+    _, padded = timed("pad", lambda: pad(rows), baseline)
+    assert np.array_equal(padded, expected)
+    timed("pad(...).T.copy() (transpose)", lambda: pad(rows).T.copy(), baseline)
+    print("  ✅ Same results from both")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,36 @@
-from math import floor
+from functools import lru_cache
+
+# optional dependencies
+try:
+	import numpy
+except ImportError:
+	numpy = None
+try:
+	import pandas
+except ImportError:
+	pandas = None
+
+MS_PER_SECOND = 1000
+MS_PER_MINUTE = MS_PER_SECOND * 60
+MS_PER_HOUR = MS_PER_MINUTE * 60
+MS_PER_DAY = MS_PER_HOUR * 24
+# days wrap around after a (365 day) year
+MS_PER_YEAR = MS_PER_DAY * 365
+
+# (milliseconds per unit, singular label, plural label), largest unit first
+UNIT_LABELS = (
+	(MS_PER_DAY, "day", "days"),
+	(MS_PER_HOUR, "hour", "hours"),
+	(MS_PER_MINUTE, "minute", "minutes"),
+	(MS_PER_SECOND, "second", "seconds"),
+	(1, "millisecond", "milliseconds"),
+)
+
+# distinct (ms, granularity) pairs remembered by time_breakdown_string
+TIME_STRING_CACHE_SIZE = 4096
+
+# array elements converted to Python numbers at a time by iter_time_breakdown_strings
+STRING_BATCH_SIZE = 4096
 
 def time_breakdown(ms):
 	"""Converts an integer representing number of milliseconds into a dictionary 
@@ -17,22 +49,64 @@ def time_breakdown(ms):
 		{'day': 1, 'hr': 10, 'min': 17, 'sec': 36, 'ms': 789} 
 	"""
 
-	ms_out = ms % 1000;
-	sec = floor((ms % (1000 * 60)) / 1000)
-	min = floor((ms % (1000 * 60 * 60)) / 1000 / 60)
-	hr = floor((ms % (1000 * 60 * 60 * 24)) / 1000 / 60 / 60)
-	day = floor(
-		(ms % (1000 * 60 * 60 * 24 * 365)) / 1000 / 60 / 60 / 24
-	)
+	# integer divmod, so large values are never rounded through a float
+	day, rest = divmod(ms % MS_PER_YEAR, MS_PER_DAY)
+	hr, rest = divmod(rest, MS_PER_HOUR)
+	min, rest = divmod(rest, MS_PER_MINUTE)
+	sec, ms_out = divmod(rest, MS_PER_SECOND)
 
 	return {
-		"day": day,
-		"hr": hr,
-		"min": min,
-		"sec": sec,
+		"day": int(day),
+		"hr": int(hr),
+		"min": int(min),
+		"sec": int(sec),
 		"ms": round(ms_out)
 	}
 
+def time_breakdown_array(ms):
+	"""Vectorized time_breakdown for many durations at once. Requires numpy.
+
+	Parameters:
+		ms (numpy array, pandas Series or sequence): numbers of milliseconds.
+		Floats are rounded to the nearest millisecond first; NaN, infinite or
+		values outside the int64 range raise ValueError (drop or fill them first).
+
+	Returns:
+		(dictionary of int64 arrays): day, hr, min, sec and ms components, with the
+		shape of the input. A pandas Series gives a DataFrame with the same index instead.
+
+	Example usage:
+		>>> time_breakdown_array(numpy.array([123456789, 1000]))
+		{'day': array([1, 0]), 'hr': array([10, 0]), 'min': array([17, 0]), 'sec': array([36, 1]), 'ms': array([789, 0])}
+	"""
+	if numpy is None:
+		raise ImportError("time_breakdown_array requires numpy: pip install numpy")
+
+	index = ms.index if pandas is not None and isinstance(ms, pandas.Series) else None
+	values = numpy.asarray(ms)
+	if numpy.issubdtype(values.dtype, numpy.unsignedinteger):
+		if values.size and values.max() > numpy.iinfo(numpy.int64).max:
+			raise ValueError("durations outside the int64 range cannot be broken down")
+	elif not numpy.issubdtype(values.dtype, numpy.integer):
+		if not numpy.isfinite(values).all():
+			raise ValueError("cannot break down NaN or infinite durations")
+		values = numpy.rint(values)
+		# 2**63 itself is exact as a float but one past the int64 maximum
+		if values.size and (values.min() < -2.0**63 or values.max() >= 2.0**63):
+			raise ValueError("durations outside the int64 range cannot be broken down")
+	values = values.astype(numpy.int64, copy=False)
+
+	day, rest = numpy.divmod(values % MS_PER_YEAR, MS_PER_DAY)
+	hr, rest = numpy.divmod(rest, MS_PER_HOUR)
+	min, rest = numpy.divmod(rest, MS_PER_MINUTE)
+	sec, ms_out = numpy.divmod(rest, MS_PER_SECOND)
+
+	breakdown = {"day": day, "hr": hr, "min": min, "sec": sec, "ms": ms_out}
+	if index is not None:
+		return pandas.DataFrame(breakdown, index=index)
+	return breakdown
+
+@lru_cache(maxsize=TIME_STRING_CACHE_SIZE)
 def time_breakdown_string(ms, granularity=5):
 	"""Converts an integer representing number of milliseconds into a string that 
 	uses natural language to represent the time quantity.
@@ -54,40 +128,62 @@ def time_breakdown_string(ms, granularity=5):
 		granularity=3)
 		
 		'1 day 10 hours 17 minutes'
-	"""
-
-	time = time_breakdown(ms)
-	time_string = ""
 
-	if time["day"] != 0:
-		time_string += str(time["day"]) + " day"
-		if time["day"] != 1:
-			time_string += "s"
-
-	if time["hr"] != 0:
-		time_string += " " + str(time["hr"]) + " hour"
-		if time["hr"] != 1:
-			time_string += "s"
-
-	if time["min"] != 0:
-		time_string += " " + str(time["min"]) + " minute"
-		if time["min"] != 1:
-			time_string += "s"
+	Units are read from UNIT_LABELS and formatting stops once granularity units have
+	been emitted. Results are memoized for the last TIME_STRING_CACHE_SIZE distinct
+	arguments, so ms must be hashable.
+	"""
 
-	if time["sec"] != 0:
-		time_string += " " + str(time["sec"]) + " second"
-		if time["sec"] != 1:
-			time_string += "s"	
+	if granularity <= 0:
+		return ""
+
+	parts = []
+	if type(ms) is int:
+		rest = ms % MS_PER_YEAR
+		for unit_ms, singular, plural in UNIT_LABELS:
+			if rest < unit_ms:
+				continue
+			value, rest = divmod(rest, unit_ms)
+			parts.append(f"{value} {singular if value == 1 else plural}")
+			# stop as soon as enough units have been emitted
+			if len(parts) == granularity or not rest:
+				break
+	else:
+		# floats and numpy scalars take the general path
+		for value, (_, singular, plural) in zip(time_breakdown(ms).values(), UNIT_LABELS):
+			if value:
+				parts.append(f"{value} {singular if value == 1 else plural}")
+				if len(parts) == granularity:
+					break
+
+	return " ".join(parts)
+
+def iter_time_breakdown_strings(durations, granularity=5):
+	"""Yields time_breakdown_string for each duration in durations.
 
-	if time["ms"] != 0:
-		time_string += " " + str(time["ms"]) + " millisecond"
-		if time["ms"] != 1:
-			time_string += "s"	
+	Parameters:
+		durations (iterable, numpy array or pandas Series): numbers of milliseconds.
+		granularity (integer): the level of detail required.
 
-	#filter to specified granularity
-	time_string = time_string.strip().split(" ")[:2*granularity]
+	Returns:
+		(generator of strings): one string per duration, in order.
 
-	return " ".join(time_string)
+	Example usage:
+		>>> for line in iter_time_breakdown_strings(numpy.array([1000, 61000]), 1):
+		...	print(line)
+		1 second
+		1 minute
+	"""
+	if numpy is not None and (isinstance(durations, numpy.ndarray)
+			or pandas is not None and isinstance(durations, pandas.Series)):
+		# convert in slices: Python ints format faster than numpy scalars and hit the cache
+		values = numpy.asarray(durations).ravel()
+		for start in range(0, len(values), STRING_BATCH_SIZE):
+			for ms in values[start:start + STRING_BATCH_SIZE].tolist():
+				yield time_breakdown_string(ms, granularity)
+	else:
+		for ms in durations:
+			yield time_breakdown_string(ms, granularity)
 
 # Example implementation
 def main():
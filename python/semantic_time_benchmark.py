@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+# built-in dependencies
+import argparse
+import time
+
+# external dependencies
+import numpy
+import pandas
+
+from semantic_time import iter_time_breakdown_strings, time_breakdown, time_breakdown_array, time_breakdown_string
+
+
+def make_durations(count: int, seed: int = 0):
+    """Request-latency-like durations in ms: mostly sub-second, with a long tail up to days."""
+    rng = numpy.random.default_rng(seed)
+    return rng.lognormal(mean=5.0, sigma=3.0, size=count).astype(numpy.int64)
+
+
+def bench_batch(count: int):
+    durations = make_durations(count)
+    as_list = durations.tolist()
+    series = pandas.Series(durations)
+    print(f"⏱️  Breaking down {count:,} durations")
+
+    start = time.perf_counter()
+    scalar = [time_breakdown(ms) for ms in as_list]
+    loop_time = time.perf_counter() - start
+    print(f"  time_breakdown loop           {loop_time:8.3f} s")
+
+    start = time.perf_counter()
+    arrays = time_breakdown_array(durations)
+    array_time = time.perf_counter() - start
+    print(f"  time_breakdown_array (numpy)  {array_time:8.3f} s  ({loop_time / array_time:.1f}x)")
+
+    start = time.perf_counter()
+    time_breakdown_array(series)
+    series_time = time.perf_counter() - start
+    print(f"  time_breakdown_array (pandas) {series_time:8.3f} s  ({loop_time / series_time:.1f}x)")
+
+    for unit, values in arrays.items():
+        assert values.tolist() == [row[unit] for row in scalar], f"{unit} differs from time_breakdown"
+    print("  ✅ Same components from both")
+
+
+def ns_per_call(label: str, run, calls: int):
+    start = time.perf_counter_ns()
+    run()
+    elapsed = time.perf_counter_ns() - start
+    print(f"  {label:<38} {elapsed / calls:8.0f} ns/call")
+
+
+def bench_string(count: int, distinct: int):
+    durations = make_durations(count)
+    as_list = durations.tolist()
+    repeated = (as_list[:distinct] * (count // distinct + 1))[:count]
+    uncached = time_breakdown_string.__wrapped__
+    print(f"⏱️  Formatting {count:,} durations")
+
+    for granularity in (5, 2, 1):
+        ns_per_call(
+            f"uncached, granularity {granularity}",
+            lambda: [uncached(ms, granularity) for ms in as_list],
+            count,
+        )
+
+    time_breakdown_string.cache_clear()
+    ns_per_call(
+        f"cached, {distinct:,} distinct values",
+        lambda: [time_breakdown_string(ms, 2) for ms in repeated],
+        count,
+    )
+    time_breakdown_string.cache_clear()
+    ns_per_call(
+        "iter_time_breakdown_strings (numpy)",
+        lambda: sum(1 for _ in iter_time_breakdown_strings(durations, 2)),
+        count,
+    )
+    print(f"  {time_breakdown_string.cache_info()}")
+
+
+def main():
+    """
+    Benchmarks for semantic_time.py.
+
+    Usage:
+        python semantic_time_benchmark.py batch [--count 1000000]
+        python semantic_time_benchmark.py string [--count 1000000] [--distinct 1000]
+
+    The string benchmark reports nanoseconds per time_breakdown_string call, so numbers
+    can be compared between runs and machines of the same kind.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark semantic_time.py.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="Scalar time_breakdown loop vs. time_breakdown_array.")
+    batch_parser.add_argument("--count", type=int, default=1_000_000, help="Number of durations.")
+
+    string_parser = subparsers.add_parser("string", help="ns per call of time_breakdown_string.")
+    string_parser.add_argument("--count", type=int, default=1_000_000, help="Number of calls per case.")
+    string_parser.add_argument("--distinct", type=int, default=1000, help="Distinct values in the cached case.")
+
+    args = parser.parse_args()
+    if args.benchmark == "batch":
+        bench_batch(args.count)
+    elif args.benchmark == "string":
+        bench_string(args.count, args.distinct)
+
+
+if __name__ == "__main__":
+    main()
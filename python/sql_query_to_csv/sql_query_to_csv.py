@@ -1,3 +1,113 @@
+import csv
+import datetime
+import decimal
+import io
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import chain, islice, repeat
+from operator import itemgetter
+
+from sqlalchemy import Table, create_engine, func, inspect, select, text
+from sqlalchemy.engine import Connection, Result
+
+# optional dependencies
+try:
+	import pyarrow
+	import pyarrow.ipc
+	import pyarrow.parquet
+except ImportError:
+	pyarrow = None
+
+# Rows fetched from the database and written to the stream per batch.
+DEFAULT_BATCH_SIZE = 1000
+
+# Engine of an export_partitioned worker process, created once per process from the URL.
+_worker_engine = None
+
+
+def _stream_rows(query_output, batch_size):
+	"""	Iterate over query_output, fetching batch_size rows at a time where the source supports it.
+
+	A Query or Result gets yield_per(batch_size), which also turns on a server-side cursor
+	(stream_results) on drivers that have one, so the full result is never held in memory.
+	The rows of a Result such as session.execute(select(User)) are Row tuples, so a
+	Result with one column is unwrapped to its entities with scalars(). Lists and other
+	iterables are iterated as they are.
+	"""
+	if hasattr(query_output, "yield_per"):
+		query_output = query_output.yield_per(batch_size)
+	if isinstance(query_output, Result):
+		if len(query_output.keys()) != 1:
+			raise ValueError("A Result must select a single ORM entity, e.g. session.execute(select(User))")
+		query_output = query_output.scalars()
+	return iter(query_output)
+
+
+def iter_csv_rows(query_output, columns_to_exclude=(), batch_size=DEFAULT_BATCH_SIZE):
+	"""	Yield the header and then one list of values per row of a SQLAlchemy ORM query.
+
+	Column names are the mapped column attributes of the first row's model, sorted, minus
+	columns_to_exclude. Values are read with getattr, so no instance __dict__ is touched.
+
+	Parameters:
+		query_output (Query, Result or iterable of <class 'SQLAlchemy.Model'>): rows to export.
+		columns_to_exclude (iterable of str): names of columns to leave out.
+		batch_size (int): rows fetched per round trip when query_output supports yield_per.
+	"""
+	rows = _stream_rows(query_output, batch_size)
+	first = next(rows, None)
+	if first is None:
+		return
+
+	columns_to_exclude = set(columns_to_exclude)
+	column_names = sorted(
+		attr.key for attr in inspect(first).mapper.column_attrs
+		if attr.key not in columns_to_exclude
+	)
+	yield column_names
+
+	for row in chain((first,), rows):
+		yield [getattr(row, column_name) for column_name in column_names]
+
+
+def write_csv(query_output, stream, columns_to_exclude=(), batch_size=DEFAULT_BATCH_SIZE, lineterminator="\r\n"):
+	"""	Stream the output of a SQLAlchemy ORM query to a text stream as .csv.
+
+	Rows are written batch_size at a time through the csv module, which quotes fields
+	containing commas, quotes or newlines. None is written as an empty field.
+
+	Parameters:
+		query_output (Query, Result or iterable of <class 'SQLAlchemy.Model'>): rows to export.
+		stream (text file object): destination, opened with newline="" if it is a file.
+		columns_to_exclude (iterable of str): names of columns to leave out.
+		batch_size (int): rows fetched and written per batch.
+		lineterminator (str): end of each record, \r\n as in RFC 4180 by default.
+
+	Returns:
+		count (int): number of data rows written.
+
+	Example usage:
+		with open("users.csv", "w", newline="") as f:
+			write_csv(session.query(User), f, ["id", "age", "address"])
+	"""
+	writer = csv.writer(stream, lineterminator=lineterminator)
+	rows = iter_csv_rows(query_output, columns_to_exclude, batch_size)
+	header = next(rows, None)
+	if header is None:
+		return 0
+	writer.writerow(header)
+
+	count = 0
+	while True:
+		batch = list(islice(rows, batch_size))
+		if not batch:
+			return count
+		writer.writerows(batch)
+		count += len(batch)
+
+
 def sql_query_to_csv(query_output, columns_to_exclude=""):
 	"""	Converts output from a SQLAlchemy query to a .csv string.
 
@@ -11,28 +121,288 @@ def sql_query_to_csv(query_output, columns_to_exclude=""):
 	Example usage:
 		users = db.Users.query.filter_by(user_id=123)
 		csv = sql_query_to_csv(users, ["id", "age", "address"]
+
+	Lines end with \n, as they always have here. For large results use write_csv, which
+	streams to a file instead of building a string.
+	"""
+	output = io.StringIO()
+	write_csv(query_output, output, columns_to_exclude, lineterminator="\n")
+	return output.getvalue()
+
+
+def _as_statement(statement):
+	"""	Accept a select(), a Table or mapped class (exported whole), or a raw SQL string."""
+	if isinstance(statement, str):
+		return text(statement)
+	if isinstance(statement, Table) or hasattr(statement, "__table__"):
+		return select(statement)
+	return statement
+
+
+def iter_select_batches(bind, statement, columns_to_exclude=(), batch_size=DEFAULT_BATCH_SIZE):
+	"""	Run statement through SQLAlchemy Core and yield the column names, then lists of row tuples.
+
+	No ORM objects are built: rows come straight from the cursor as tuples, batch_size at a
+	time, with stream_results set so drivers that support it use a server-side cursor.
+	Columns keep the order of the statement.
+
+	Parameters:
+		bind (Engine or Connection): where to run the statement.
+		statement (Select, Table, mapped class or str): what to export.
+		columns_to_exclude (iterable of str): names of columns to leave out.
+		batch_size (int): rows fetched per round trip and per yielded batch.
 	"""
-	rows = query_output
+	statement = _as_statement(statement)
 	columns_to_exclude = set(columns_to_exclude)
 
-	#create list of column names  
-	column_names = [i for i in rows[0].__dict__]
-	for column_name in columns_to_exclude:
-		column_names.pop(column_names.index(column_name))
-
-	#add column titles to csv
-	column_names.sort()
-	csv = ", ".join(column_names) + "\n"
-
-	#add rows of data to csv
-	for row in rows:
-		for column_name in column_names:
-			if column_name not in columns_to_exclude:
-				data = str(row.__dict__[column_name])
-				#Escape (") symbol by preceeding with another (")
-				data.replace('"','""')
-				#Enclose each datum in double quotes so commas within are not treated as separators
-				csv += '"' + data + '"' + ","
-		csv += "\n"
-
-	return csv
+	def run(connection):
+		result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement)
+		keys = list(result.keys())
+		kept = [i for i, key in enumerate(keys) if key not in columns_to_exclude]
+		yield [keys[i] for i in kept]
+
+		if len(kept) == len(keys):
+			for batch in result.partitions():
+				yield batch
+		else:
+			# itemgetter with one index returns a bare value, not a 1-tuple
+			pick = itemgetter(*kept) if len(kept) > 1 else lambda row: (row[kept[0]],)
+			for batch in result.partitions():
+				yield [pick(row) for row in batch]
+
+	if isinstance(bind, Connection):
+		yield from run(bind)
+	else:
+		with bind.connect() as connection:
+			yield from run(connection)
+
+
+def write_select_csv(bind, statement, stream, columns_to_exclude=(), batch_size=DEFAULT_BATCH_SIZE):
+	"""	Export a Core select() or raw SQL query to a text stream as .csv, without ORM instances.
+
+	Much faster than write_csv for large tables, since each row stays a tuple from the
+	cursor to csv.writer. See iter_select_batches for the accepted statements.
+
+	Returns:
+		count (int): number of data rows written.
+
+	Example usage:
+		with open("users.csv", "w", newline="") as f:
+			write_select_csv(engine, select(User).where(User.id > 100), f)
+	"""
+	writer = csv.writer(stream)
+	batches = iter_select_batches(bind, statement, columns_to_exclude, batch_size)
+	writer.writerow(next(batches))
+
+	count = 0
+	for batch in batches:
+		writer.writerows(batch)
+		count += len(batch)
+	return count
+
+
+def _arrow_type(sql_type):
+	"""	The Arrow type of a SQLAlchemy column type, or None if it has to be inferred from the data."""
+	try:
+		python_type = sql_type.python_type
+	except NotImplementedError:
+		return None
+	if python_type is datetime.datetime:
+		return pyarrow.timestamp("us", tz="UTC" if getattr(sql_type, "timezone", False) else None)
+	if python_type is decimal.Decimal:
+		precision, scale = getattr(sql_type, "precision", None), getattr(sql_type, "scale", None)
+		return pyarrow.decimal128(precision, scale or 0) if precision else None
+	return {
+		bool: pyarrow.bool_(), int: pyarrow.int64(), float: pyarrow.float64(),
+		str: pyarrow.string(), bytes: pyarrow.binary(), datetime.date: pyarrow.date32(),
+		datetime.time: pyarrow.time64("us"), datetime.timedelta: pyarrow.duration("us"),
+	}.get(python_type)
+
+
+def write_select_arrow(bind, statement, path, columns_to_exclude=(), batch_size=DEFAULT_BATCH_SIZE, output_format="parquet"):
+	"""	Export a Core select() or raw SQL query to a Parquet or Arrow IPC file. Requires pyarrow.
+
+	Each batch of rows becomes one Arrow record batch (one row group for Parquet). Column
+	types come from the statement's column types where SQLAlchemy knows them; the others
+	(e.g. every column of a raw SQL string) are inferred from the data. Batches are held
+	back until each inferred column has had a non-null value, so a column that starts with
+	NULLs does not get Arrow's null type. No file is written for an empty result.
+
+	Parameters:
+		path (str or binary file object): destination.
+		output_format (str): "parquet" or "arrow".
+
+	Returns:
+		count (int): number of data rows written.
+	"""
+	if pyarrow is None:
+		raise ImportError(f"pyarrow is required for {output_format} output: pip install pyarrow")
+	if output_format not in ("parquet", "arrow"):
+		raise ValueError(f"Unknown output_format {output_format!r}, expected 'parquet' or 'arrow'")
+
+	statement = _as_statement(statement)
+	declared = {column.key: _arrow_type(column.type) for column in getattr(statement, "selected_columns", ())}
+	batches = iter_select_batches(bind, statement, columns_to_exclude, batch_size)
+	column_names = next(batches)
+	types = [declared.get(name) for name in column_names]
+	pending = []
+	schema = writer = None
+	count = 0
+
+	def open_writer():
+		if output_format == "parquet":
+			return pyarrow.parquet.ParquetWriter(path, schema)
+		return pyarrow.ipc.new_file(path, schema)
+
+	def write(columns):
+		writer.write_batch(pyarrow.RecordBatch.from_arrays(
+			[pyarrow.array(c, type=column_type) for c, column_type in zip(columns, schema.types)],
+			schema=schema,
+		))
+
+	try:
+		for batch in batches:
+			columns = list(zip(*batch))
+			count += len(batch)
+			if writer is not None:
+				write(columns)
+				continue
+			for i, column_type in enumerate(types):
+				if column_type is None:
+					inferred = pyarrow.array(columns[i]).type
+					types[i] = None if inferred == pyarrow.null() else inferred
+			pending.append(columns)
+			if None not in types:
+				schema = pyarrow.schema(list(zip(column_names, types)))
+				writer = open_writer()
+				for columns in pending:
+					write(columns)
+				pending.clear()
+		if pending:
+			# columns that were NULL in every row keep the null type
+			schema = pyarrow.schema([
+				(name, pyarrow.null() if column_type is None else column_type)
+				for name, column_type in zip(column_names, types)
+			])
+			writer = open_writer()
+			for columns in pending:
+				write(columns)
+	finally:
+		if writer is not None:
+			writer.close()
+	return count
+
+
+def key_ranges(lowest, highest, partitions):
+	"""	Split the integer keys lowest..highest into at most `partitions` contiguous [start, stop) ranges."""
+	span = highest - lowest + 1
+	partitions = max(1, min(partitions, span))
+	step, extra = divmod(span, partitions)
+	ranges = []
+	start = lowest
+	for i in range(partitions):
+		stop = start + step + (1 if i < extra else 0)
+		ranges.append((start, stop))
+		start = stop
+	return ranges
+
+
+def merge_csv_shards(shard_paths, merge_path):
+	"""	Concatenate .csv shards in the given order into merge_path, keeping only the first header."""
+	with open(merge_path, "wb") as merged:
+		for i, shard_path in enumerate(shard_paths):
+			with open(shard_path, "rb") as shard:
+				header = shard.readline()
+				if i == 0:
+					merged.write(header)
+				shutil.copyfileobj(shard, merged)
+
+
+def _init_worker(url):
+	global _worker_engine
+	_worker_engine = create_engine(url)
+
+
+def _export_shard(bind, partition, shard_path, columns_to_exclude, batch_size):
+	"""	Write one partition to shard_path. bind is None in a worker process, which uses its own engine."""
+	with open(shard_path, "w", newline="", encoding="utf-8") as shard:
+		count = write_select_csv(bind or _worker_engine, partition, shard, columns_to_exclude, batch_size)
+	return shard_path, count
+
+
+def export_partitioned(engine, statement, key_column, shard_dir, partitions=8, workers=4,
+		columns_to_exclude=(), batch_size=DEFAULT_BATCH_SIZE, merge_path=None, processes=False):
+	"""	Export a select() in parallel, one .csv shard per range of an integer key column.
+
+	The key range of the statement is split into `partitions` equal ranges. Each range is
+	exported by write_select_csv in a worker thread, on its own connection from the engine's
+	pool, so the database runs `workers` queries at once. Size the engine's pool_size to at
+	least `workers`. Threads share one interpreter, so row conversion and csv formatting do
+	not run in parallel; with processes=True each worker is a process with its own engine
+	(created from engine.url), which also spreads that work over the CPUs. Statements are
+	sent to the processes pickled, which ORM constructs do not support: pass a Table, a
+	mapped class (exported as its table) or a Core select().
+
+	Parameters:
+		engine (Engine): engine whose connection pool the workers share.
+		statement (Select, Table or mapped class): what to export. Raw SQL cannot be partitioned.
+		key_column (Column): integer column to partition on, e.g. User.id.
+		shard_dir (str): directory the shards are written to, as part0000.csv, part0001.csv, ...
+		partitions (int): number of key ranges (and shards).
+		workers (int): number of partitions exported at the same time.
+		columns_to_exclude (iterable of str): names of columns to leave out.
+		batch_size (int): rows fetched and written per batch.
+		merge_path (str): if given, each partition is ordered by key_column and the shards are
+			concatenated into this file in key order, with a single header.
+		processes (bool): run the workers as processes instead of threads.
+
+	Returns:
+		shards (list of (str, int)): path and row count of each shard, in key order.
+
+	Example usage:
+		engine = create_engine("postgresql://...", pool_size=8)
+		export_partitioned(engine, select(User), User.id, "users", partitions=32, workers=8,
+			merge_path="users.csv")
+	"""
+	if isinstance(statement, str):
+		raise ValueError("export_partitioned needs a select(), Table or mapped class, not raw SQL")
+	if processes and hasattr(statement, "__table__"):
+		statement = statement.__table__
+	statement = _as_statement(statement)
+	if processes:
+		# the plain column of the statement, not an ORM attribute, so partitions can be pickled
+		key_column = statement.selected_columns[key_column.key]
+
+	bounds = statement.subquery()
+	with engine.connect() as connection:
+		lowest, highest = connection.execute(
+			select(func.min(bounds.c[key_column.key]), func.max(bounds.c[key_column.key]))
+		).one()
+	ranges = key_ranges(lowest, highest, partitions) if lowest is not None else [(0, 0)]
+
+	os.makedirs(shard_dir, exist_ok=True)
+
+	tasks = []
+	for index, (start, stop) in enumerate(ranges):
+		partition = statement.where(key_column >= start, key_column < stop)
+		if merge_path:
+			partition = partition.order_by(key_column)
+		tasks.append((partition, os.path.join(shard_dir, f"part{index:04d}.csv"), columns_to_exclude, batch_size))
+
+	if processes:
+		try:
+			pickle.dumps(tasks[0][0])
+		except Exception as error:
+			raise ValueError(
+				"processes=True needs a Table, mapped class or Core select(), not an ORM select()"
+			) from error
+		url = engine.url.render_as_string(hide_password=False)
+		with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(url,)) as pool:
+			shards = list(pool.map(_export_shard, repeat(None), *zip(*tasks)))
+	else:
+		with ThreadPoolExecutor(max_workers=workers) as pool:
+			shards = list(pool.map(_export_shard, repeat(engine), *zip(*tasks)))
+
+	if merge_path:
+		merge_csv_shards([shard_path for shard_path, _ in shards], merge_path)
+	return shards
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# built-in dependencies
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# external dependencies
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from sql_query_to_csv import export_partitioned, pyarrow, write_csv, write_select_arrow, write_select_csv
+from sql_query_to_csv_example import Base, User
+
+
+def populate(engine, row_count: int, chunk_size: int = 50_000):
+    """Insert `row_count` synthetic users with Core executemany, in chunks."""
+    start = datetime(1900, 1, 1)
+    with engine.begin() as connection:
+        for offset in range(0, row_count, chunk_size):
+            connection.execute(
+                User.__table__.insert(),
+                [
+                    {
+                        "name": f"U{i}",
+                        "fullname": f"User, Number {i}",
+                        "birth": start + timedelta(days=i % 40_000),
+                    }
+                    for i in range(offset, min(offset + chunk_size, row_count))
+                ],
+            )
+
+
+def timed(label: str, export, baseline: float | None = None) -> float:
+    start = time.perf_counter()
+    count = export()
+    elapsed = time.perf_counter() - start
+    speedup = f"  ({baseline / elapsed:.2f}x)" if baseline else ""
+    print(f"  {label:<36} {elapsed:8.2f} s  {count:,} rows{speedup}")
+    return elapsed
+
+
+def main():
+    """
+    Benchmark the ORM export path (write_csv) against the Core and partitioned paths.
+
+    Usage:
+        python sql_query_to_csv_benchmark.py [--rows 1000000] [--batch-size 1000] [--db FILE]
+                                             [--partitions 16] [--workers 4]
+
+    Uses the User model from sql_query_to_csv_example.py on SQLite. Without --db the table
+    is built in a temporary file; with --db an existing, already populated file is reused.
+    Output is written to os.devnull, except for the partitioned exports (with threads and
+    with processes), which write shards and a merged file to the temporary directory. The
+    process pool only pays off with more than one CPU. Parquet is timed too when pyarrow
+    is installed.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark sql_query_to_csv export paths.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Number of synthetic users.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per fetch and write batch.")
+    parser.add_argument("--db", help="SQLite file to use instead of a temporary one.")
+    parser.add_argument("--partitions", type=int, default=16, help="Key ranges for the partitioned exports.")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads (or processes) for the partitioned exports.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.sqlite")
+        fresh = not os.path.exists(db_path)
+        engine = create_engine(f"sqlite:///{db_path}", pool_size=args.workers)
+        Base.metadata.create_all(bind=engine)
+        if fresh:
+            print(f"🏗️  Inserting {args.rows:,} users into {db_path}")
+            populate(engine, args.rows)
+
+        print(f"⏱️  Exporting the User table (batch size {args.batch_size:,})")
+        with open(os.devnull, "w", newline="", encoding="utf-8") as devnull:
+            with Session(engine) as session:
+                baseline = timed(
+                    "ORM write_csv",
+                    lambda: write_csv(session.query(User), devnull, batch_size=args.batch_size),
+                )
+            timed(
+                "Core write_select_csv (select)",
+                lambda: write_select_csv(engine, select(User), devnull, batch_size=args.batch_size),
+                baseline,
+            )
+            timed(
+                "Core write_select_csv (SQL)",
+                lambda: write_select_csv(engine, 'SELECT * FROM "User"', devnull, batch_size=args.batch_size),
+                baseline,
+            )
+        timed(
+            f"Partitioned ({args.workers} workers, merged)",
+            lambda: sum(
+                count
+                for _, count in export_partitioned(
+                    engine,
+                    select(User),
+                    User.id,
+                    os.path.join(tmp, "shards"),
+                    partitions=args.partitions,
+                    workers=args.workers,
+                    batch_size=args.batch_size,
+                    merge_path=os.path.join(tmp, "users.csv"),
+                )
+            ),
+            baseline,
+        )
+        timed(
+            f"Partitioned ({args.workers} processes, merged)",
+            lambda: sum(
+                count
+                for _, count in export_partitioned(
+                    engine,
+                    User,
+                    User.id,
+                    os.path.join(tmp, "process_shards"),
+                    partitions=args.partitions,
+                    workers=args.workers,
+                    batch_size=args.batch_size,
+                    merge_path=os.path.join(tmp, "users_processes.csv"),
+                    processes=True,
+                )
+            ),
+            baseline,
+        )
+        if pyarrow is not None:
+            timed(
+                "Core write_select_arrow (parquet)",
+                lambda: write_select_arrow(
+                    engine, select(User), os.path.join(tmp, "users.parquet"), batch_size=args.batch_size
+                ),
+                baseline,
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
+import sys
 from datetime import datetime
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, select
 from sqlalchemy import Column, String, Integer, DateTime
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 
-from sql_query_to_csv import sql_query_to_csv
+from sql_query_to_csv import sql_query_to_csv, write_csv, write_select_csv
 
 Base = declarative_base()
 
@@ -18,36 +19,44 @@ class User(Base):
     fullname = Column(String, nullable=False)
     birth    = Column(DateTime)
 
-engine = create_engine('sqlite:///db.sqlite')
-Base.metadata.create_all(bind=engine)
-
-users = [
-    User(name='JH',
-         fullname='Jimi Hendrix',
-         birth=datetime(1942,11,27)),
-    User(name='RJ',
-         fullname='Robert Johnson',
-         birth=datetime(1943,12,8)),
-    User(name='JM',
-         fullname='Jim Morrison',
-         birth=datetime(1911,5,8))]
-
-# create session
-Session = sessionmaker()
-Session.configure(bind=engine)
-session = Session()
-
-# add data
-session.add_all(users)
-session.commit()
-
-# query database
-query = session.query(User).all()
-
-# output all users to csv
-csv_1 = sql_query_to_csv(query)
-print(csv_1)
-
-# output all users to csv, excluding some columns
-csv_2 = sql_query_to_csv(query, ["birth", "id", "_sa_instance_state"])
-print(csv_2)
+if __name__ == "__main__":
+    engine = create_engine('sqlite:///db.sqlite')
+    Base.metadata.create_all(bind=engine)
+
+    users = [
+        User(name='JH',
+             fullname='Jimi Hendrix',
+             birth=datetime(1942,11,27)),
+        User(name='RJ',
+             fullname='Robert Johnson',
+             birth=datetime(1943,12,8)),
+        User(name='JM',
+             fullname='Jim Morrison',
+             birth=datetime(1911,5,8))]
+
+    # create session
+    Session = sessionmaker()
+    Session.configure(bind=engine)
+    session = Session()
+
+    # add data
+    session.add_all(users)
+    session.commit()
+
+    # query database
+    query = session.query(User).all()
+
+    # output all users to csv
+    csv_1 = sql_query_to_csv(query)
+    print(csv_1)
+
+    # output all users to csv, excluding some columns
+    csv_2 = sql_query_to_csv(query, ["birth", "id"])
+    print(csv_2)
+
+    # stream all users to stdout in batches, without loading the whole table
+    write_csv(session.query(User).order_by(User.id), sys.stdout, batch_size=2)
+
+    # same through Core: rows stay tuples, no User instances are built
+    write_select_csv(engine, select(User).order_by(User.id), sys.stdout, ["birth"])
+    write_select_csv(engine, 'SELECT name, fullname FROM "User" WHERE id > 1', sys.stdout)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+# built-in dependencies
+import argparse
+import os
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+from pathlib import Path
+
+
+def default_worker_counts():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    if cpus > 1:
+        counts.append(cpus)
+    return counts
+
+
+def main():
+    """
+    Benchmark summarize-python-project.py --workers on a large real-world tree.
+
+    Usage:
+        python summarize-python-project-benchmark.py [--tree DIR] [--workers 1 2 4 8] [--repeat 3]
+
+    Defaults to the standard library of the running interpreter. Each worker count runs
+    the script end to end in a subprocess, and the best of --repeat runs is reported.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark summarize-python-project.py --workers.")
+    parser.add_argument("--tree", default=sysconfig.get_paths()["stdlib"], help="Directory to summarize (default: stdlib).")
+    parser.add_argument("--workers", type=int, nargs="+", default=default_worker_counts(), help="Worker counts to compare.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count; the fastest is reported.")
+    parser.add_argument("--full", action="store_true", help="Dump file contents instead of --signatures-only.")
+    args = parser.parse_args()
+
+    script = Path(__file__).with_name("summarize-python-project.py")
+    file_count = sum(1 for path in Path(args.tree).rglob("*.py") if path.is_file())
+    print(f"⏱️  {script.name} on {file_count:,} files in {args.tree}")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "summary.md"
+        for workers in args.workers:
+            cmd = [sys.executable, str(script), args.tree, str(output), "--workers", str(workers)]
+            if not args.full:
+                cmd.append("--signatures-only")
+            times = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                subprocess.run(cmd, check=True)
+                times.append(time.perf_counter() - start)
+            best = min(times)
+            baseline = baseline or best
+            print(f"  --workers {workers:<3} {best:8.2f} s  ({baseline / best:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
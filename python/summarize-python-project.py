@@ -1,46 +1,76 @@
 import argparse
 import ast
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def extract_signatures(filepath, include_docstrings=True):
+# Write buffer for the output file. Summaries are streamed through it as they are produced.
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# With --workers, at most this many chunks per worker are in flight or waiting to be
+# written, which bounds memory when workers run ahead of the writer.
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+# Columns of the --index symbol table, in the order produced by extract_symbols.
+SYMBOL_COLUMNS = ("module", "qualname", "kind", "signature", "docstring", "decorators", "path", "lineno", "end_lineno")
+
+# Assignments recorded in the symbol table are cut to this many characters.
+MAX_ASSIGNMENT_LENGTH = 200
+
+def format_args(args_node):
+    """
+    Render a function's parameters (names, annotations, *args, **kwargs) as a string.
+    """
+    args = []
+    for arg in args_node.args:
+        arg_str = arg.arg
+        if arg.annotation:
+            arg_str += f": {ast.unparse(arg.annotation)}"
+        args.append(arg_str)
+    if args_node.vararg:
+        args.append(f"*{args_node.vararg.arg}")
+    for kwarg in args_node.kwonlyargs:
+        arg_str = kwarg.arg
+        if kwarg.annotation:
+            arg_str += f": {ast.unparse(kwarg.annotation)}"
+        args.append(arg_str)
+    if args_node.kwarg:
+        args.append(f"**{args_node.kwarg.arg}")
+    return ", ".join(args)
+
+def function_signature(node, indent=""):
+    """
+    Return the `def` line of a function or method node, e.g. `async def f(x: int) -> str:`.
+    """
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    sig = f"{indent}{prefix} {node.name}({format_args(node.args)})"
+    if node.returns:
+        sig += f" -> {ast.unparse(node.returns)}"
+    return sig + ":"
+
+def extract_signatures(filepath, include_docstrings=True, source=None):
     """
-    Extract function and class signatures (with optional docstrings) from a Python file.
-    Returns content wrapped in Markdown code block format.
+    Extract function and class signatures (with optional docstrings) from a Python file,
+    or from its already read `source`. Returns content wrapped in Markdown code block format.
     """
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            source = f.read()
+        if source is None:
+            with open(filepath, "r", encoding="utf-8") as f:
+                source = f.read()
         tree = ast.parse(source, filename=filepath)
     except Exception as e:
         return f"{filepath}\n```python\n# Skipped: {e}\n```\n"
 
     lines = []
 
-    def format_args(args_node):
-        args = []
-        for arg in args_node.args:
-            arg_str = arg.arg
-            if arg.annotation:
-                arg_str += f": {ast.unparse(arg.annotation)}"
-            args.append(arg_str)
-        if args_node.vararg:
-            args.append(f"*{args_node.vararg.arg}")
-        for kwarg in args_node.kwonlyargs:
-            arg_str = kwarg.arg
-            if kwarg.annotation:
-                arg_str += f": {ast.unparse(kwarg.annotation)}"
-            args.append(arg_str)
-        if args_node.kwarg:
-            args.append(f"**{args_node.kwarg.arg}")
-        return ", ".join(args)
-
     def summarize_function(node, indent=""):
-        prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
-        sig = f"{indent}{prefix} {node.name}({format_args(node.args)})"
-        if node.returns:
-            sig += f" -> {ast.unparse(node.returns)}"
-        sig += ":"
-        lines.append(sig)
+        lines.append(function_signature(node, indent))
         if include_docstrings and (doc := ast.get_docstring(node)):
             lines.append(f'{indent}    """{doc}"""')
 
@@ -57,44 +87,408 @@ def extract_signatures(filepath, include_docstrings=True):
 
     return f"{filepath}\n```python\n" + "\n".join(lines) + "\n```\n"
 
-def dump_file_contents(filepath):
+def module_name(filepath, project_path):
+    """
+    Dotted module name of `filepath` relative to the project, e.g. `pkg/sub/__init__.py` -> `pkg.sub`.
+    """
+    parts = list(Path(filepath).relative_to(project_path).with_suffix("").parts)
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts) or Path(project_path).resolve().name
+
+def extract_symbols(filepath, module):
     """
-    Return entire file contents wrapped in Markdown code block format.
+    Return the symbol table of one Python file as a list of tuples matching SYMBOL_COLUMNS.
+
+    Covers the module itself, module-level imports and assignments, and classes and
+    functions at any depth (nested ones get `Outer.Inner` or `func.<locals>.inner`
+    qualnames), with decorators, docstrings and line ranges.
     """
     try:
         with open(filepath, "r", encoding="utf-8") as f:
-            content = f.read()
+            source = f.read()
+        tree = ast.parse(source, filename=filepath)
+    except Exception:
+        return []
+
+    # resolved, so --lookup --source finds the file from any directory
+    path = str(Path(filepath).resolve())
+    end = len(source.splitlines()) or 1
+    symbols = [(module, "", "module", "", ast.get_docstring(tree) or "", "[]", path, 1, end)]
+
+    def add(qualname, kind, signature, node, docstring="", decorators=()):
+        # The line range of a decorated definition starts at its first decorator.
+        start = min([d.lineno for d in getattr(node, "decorator_list", [])] + [node.lineno])
+        symbols.append((
+            module, qualname, kind, signature, docstring, json.dumps(list(decorators)),
+            path, start, node.end_lineno or node.lineno,
+        ))
+
+    def visit(body, prefix, in_class):
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = f"{prefix}{node.name}"
+                decorators = [ast.unparse(d) for d in node.decorator_list]
+                kind = "method" if in_class else "function"
+                add(qualname, kind, function_signature(node), node, ast.get_docstring(node) or "", decorators)
+                visit(node.body, f"{qualname}.<locals>.", False)
+            elif isinstance(node, ast.ClassDef):
+                qualname = f"{prefix}{node.name}"
+                decorators = [ast.unparse(d) for d in node.decorator_list]
+                bases = ", ".join(ast.unparse(b) for b in node.bases + node.keywords)
+                signature = f"class {node.name}({bases}):" if bases else f"class {node.name}:"
+                add(qualname, "class", signature, node, ast.get_docstring(node) or "", decorators)
+                visit(node.body, f"{qualname}.", True)
+            elif not prefix and isinstance(node, (ast.Import, ast.ImportFrom)):
+                for alias in node.names:
+                    name = alias.asname or alias.name.split(".")[0]
+                    add(name, "import", ast.unparse(node), node)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)) and (not prefix or in_class):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        kind = "attribute" if in_class else ("constant" if target.id.isupper() else "variable")
+                        statement = ast.unparse(node)
+                        if len(statement) > MAX_ASSIGNMENT_LENGTH:
+                            statement = statement[:MAX_ASSIGNMENT_LENGTH] + " ..."
+                        add(f"{prefix}{target.id}", kind, statement, node)
+
+    visit(tree.body, "", False)
+    return symbols
+
+def extract_symbols_chunk(items):
+    """
+    Extract the symbols of a batch of (filepath, module) pairs in one pool task.
+    """
+    return [extract_symbols(filepath, module) for filepath, module in items]
+
+def dump_file_contents(filepath, content=None):
+    """
+    Return entire file contents (or the already read `content`) wrapped in Markdown code block format.
+    """
+    try:
+        if content is None:
+            with open(filepath, "r", encoding="utf-8") as f:
+                content = f.read()
         return f"{filepath}\n```python\n{content.rstrip()}\n```\n"
     except Exception as e:
         return f"{filepath}\n```python\n# Error reading file: {e}\n```\n"
 
+def summarize_file(filepath, signatures_only=False, include_docstrings=True, fingerprint=False):
+    """
+    Return (block, fingerprint) for one file: the Markdown block of its signatures or its
+    full contents and, if `fingerprint` is set (for the cache), the (mtime_ns, size, sha256)
+    of the bytes the block was made from. The fingerprint is None without it or if the file
+    could not be read. The file is stat'ed before it is read, so an edit in between leaves
+    a stale mtime and the next run re-checks the hash.
+    """
+    if not fingerprint:
+        if signatures_only:
+            return extract_signatures(filepath, include_docstrings), None
+        return dump_file_contents(filepath), None
+    try:
+        mtime_ns = os.stat(filepath).st_mtime_ns
+        data = Path(filepath).read_bytes()
+        # universal newlines, as open(..., "r") would give
+        source = data.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    except (OSError, UnicodeDecodeError):
+        source = fingerprint = None
+    else:
+        fingerprint = (mtime_ns, len(data), hashlib.sha256(data).hexdigest())
+    if signatures_only:
+        return extract_signatures(filepath, include_docstrings, source), fingerprint
+    return dump_file_contents(filepath, source), fingerprint
+
+def summarize_chunk(filepaths, signatures_only=False, include_docstrings=True, fingerprint=False):
+    """
+    Summarize a batch of files in one pool task, to amortize the inter-process overhead.
+    """
+    return [summarize_file(filepath, signatures_only, include_docstrings, fingerprint) for filepath in filepaths]
+
+def iter_chunk_results(pool, chunk_fn, items, chunksize, window, *args):
+    """
+    Yield `chunk_fn(chunk, *args)` results for `items` in order from a pool, keeping at most
+    `window` chunks submitted but not yet consumed. Chunks that finish early wait in the window.
+    """
+    chunks = (items[i:i + chunksize] for i in range(0, len(items), chunksize))
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(chunk_fn, chunk, *args))
+        if len(pending) >= window:
+            yield from pending.popleft().result()
+    while pending:
+        yield from pending.popleft().result()
+
+class SummaryCache:
+    """
+    SQLite cache of rendered summary blocks.
+
+    Entries are keyed by the resolved file path and a variant string (Python version,
+    since ast.unparse output changes between versions, plus the output options). A file
+    whose mtime and size are unchanged is a hit without being read; otherwise its SHA-256
+    is compared, so touched-but-identical files are still hits. The hash stored with a
+    summary is that of the bytes it was made from (see summarize_file).
+    """
+
+    def __init__(self, db_path, project_path, signatures_only, include_docstrings):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS summaries (
+                path TEXT, variant TEXT, project TEXT, mtime_ns INTEGER, size INTEGER,
+                sha256 TEXT, summary TEXT, PRIMARY KEY (path, variant))"""
+        )
+        self.project = str(Path(project_path).resolve())
+        self.variant = "py{}.{}:{}:{}".format(
+            sys.version_info.major,
+            sys.version_info.minor,
+            "signatures" if signatures_only else "contents",
+            "docstrings" if include_docstrings else "no-docstrings",
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(filepath):
+        return str(Path(filepath).resolve())
+
+    def is_fresh(self, filepath):
+        """Return True if the cached summary of `filepath` is still valid. Unreadable files are misses."""
+        try:
+            st = os.stat(filepath)
+            row = self.conn.execute(
+                "SELECT mtime_ns, size, sha256 FROM summaries WHERE path = ? AND variant = ?",
+                (self.key(filepath), self.variant),
+            ).fetchone()
+            if row and (row[0], row[1]) == (st.st_mtime_ns, st.st_size):
+                self.hits += 1
+                return True
+            same_contents = (
+                row and row[1] == st.st_size
+                and row[2] == hashlib.sha256(Path(filepath).read_bytes()).hexdigest()
+            )
+        except OSError:
+            same_contents = False
+        if same_contents:
+            self.conn.execute(
+                "UPDATE summaries SET mtime_ns = ? WHERE path = ? AND variant = ?",
+                (st.st_mtime_ns, self.key(filepath), self.variant),
+            )
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def get(self, filepath):
+        return self.conn.execute(
+            "SELECT summary FROM summaries WHERE path = ? AND variant = ?", (self.key(filepath), self.variant)
+        ).fetchone()[0]
+
+    def store(self, filepath, summary, fingerprint):
+        """Cache `summary` under the (mtime_ns, size, sha256) fingerprint returned by summarize_file."""
+        mtime_ns, size, sha256 = fingerprint
+        self.conn.execute(
+            "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self.key(filepath), self.variant, self.project, mtime_ns, size, sha256, summary),
+        )
+
+    def evict_missing(self, filepaths):
+        """Drop entries of this project for files that no longer exist (any variant)."""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen (path TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM seen")
+        self.conn.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((self.key(f),) for f in filepaths))
+        self.conn.execute(
+            "DELETE FROM summaries WHERE project = ? AND path NOT IN (SELECT path FROM seen)", (self.project,)
+        )
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def summarize_files(filepaths, signatures_only=False, include_docstrings=True, workers=1, cache=None):
+    """
+    Yield the Markdown block of each file in `filepaths`, in the same order.
+
+    With workers > 1, files are parsed in a process pool (ast.parse and ast.unparse are
+    CPU-bound and hold the GIL). Files are handed out in chunks to keep the per-task
+    overhead low, and results still come back in input order through a bounded window,
+    so memory does not grow with the project. With a `cache`, only files whose cached
+    summary is stale are parsed.
+    """
+    fresh = [cache.is_fresh(f) for f in filepaths] if cache else [False] * len(filepaths)
+    misses = [f for f, is_fresh in zip(filepaths, fresh) if not is_fresh]
+
+    with contextlib.ExitStack() as stack:
+        if workers > 1 and misses:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            chunksize = max(1, min(64, len(misses) // (workers * 8)))
+            computed = iter_chunk_results(
+                pool, summarize_chunk, misses, chunksize, workers * CHUNKS_IN_FLIGHT_PER_WORKER,
+                signatures_only, include_docstrings, cache is not None,
+            )
+        else:
+            computed = (summarize_file(f, signatures_only, include_docstrings, cache is not None) for f in misses)
+
+        for filepath, is_fresh in zip(filepaths, fresh):
+            if is_fresh:
+                yield cache.get(filepath)
+                continue
+            summary, fingerprint = next(computed)
+            if cache and fingerprint:
+                cache.store(filepath, summary, fingerprint)
+            yield summary
+
+def iter_symbols(filepaths, project_path, workers=1):
+    """
+    Yield symbol tuples for every file, in path order, using the process pool if workers > 1.
+    """
+    items = [(filepath, module_name(filepath, project_path)) for filepath in filepaths]
+    if workers <= 1:
+        for filepath, module in items:
+            yield from extract_symbols(filepath, module)
+        return
+
+    chunksize = max(1, min(64, len(items) // (workers * 8)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for symbols in iter_chunk_results(
+            pool, extract_symbols_chunk, items, chunksize, workers * CHUNKS_IN_FLIGHT_PER_WORKER
+        ):
+            yield from symbols
+
+def write_symbol_index(index_path, symbols):
+    """
+    Write symbols to a JSONL file (one object per line) if `index_path` ends in .jsonl,
+    otherwise to a SQLite database with indexes for fast lookup by name. Returns the count.
+    """
+    count = 0
+    if str(index_path).endswith(".jsonl"):
+        with open(index_path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE) as f:
+            for symbol in symbols:
+                f.write(json.dumps(dict(zip(SYMBOL_COLUMNS, symbol))) + "\n")
+                count += 1
+        return count
+
+    conn = sqlite3.connect(index_path)
+    conn.execute("DROP TABLE IF EXISTS symbols")
+    conn.execute(
+        """CREATE TABLE symbols (
+            module TEXT, qualname TEXT, kind TEXT, signature TEXT, docstring TEXT,
+            decorators TEXT, path TEXT, lineno INTEGER, end_lineno INTEGER, fullname TEXT)"""
+    )
+    rows = ((*symbol, f"{symbol[0]}.{symbol[1]}" if symbol[1] else symbol[0]) for symbol in symbols)
+    cursor = conn.executemany("INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    count = cursor.rowcount
+    conn.execute("CREATE INDEX symbols_fullname ON symbols (fullname)")
+    conn.execute("CREATE INDEX symbols_qualname ON symbols (qualname)")
+    conn.commit()
+    conn.close()
+    return count
+
+def lookup_symbols(index_path, name, with_source=False):
+    """
+    Print the symbols matching `name` from a SQLite index built with --index.
+
+    `name` may be a full dotted name (`pkg.mod.Class.method`), a qualname (`Class.method`),
+    or a trailing part of one (`method`). Exact matches use the indexes; only the
+    trailing-part fallback scans the table.
+    """
+    conn = sqlite3.connect(f"file:{index_path}?mode=ro", uri=True)
+    columns = ", ".join(SYMBOL_COLUMNS)
+    rows = conn.execute(
+        f"SELECT {columns} FROM symbols WHERE fullname = ? UNION SELECT {columns} FROM symbols WHERE qualname = ?",
+        (name, name),
+    ).fetchall()
+    if not rows:
+        suffix = f".{name}"
+        rows = conn.execute(
+            f"SELECT {columns} FROM symbols WHERE substr(qualname, -?) = ?", (len(suffix), suffix)
+        ).fetchall()
+    conn.close()
+
+    if not rows:
+        print(f"No symbol named {name!r} in {index_path}")
+        return 1
+
+    for module, qualname, kind, signature, docstring, decorators, path, lineno, end_lineno in rows:
+        print(f"{path}:{lineno}-{end_lineno} {kind} {module}{'.' if qualname else ''}{qualname}")
+        for decorator in json.loads(decorators):
+            print(f"    @{decorator}")
+        if signature:
+            print(f"    {signature}")
+        if docstring:
+            print(f'    """{docstring}"""')
+        if with_source:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    source = f.readlines()[lineno - 1:end_lineno]
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"    # Could not read source: {e}")
+            else:
+                print(f"```python\n{''.join(source).rstrip()}\n```")
+        print()
+    return 0
+
 def main():
     """
     CLI entry point. Use:
-        python summarize-python-project.py <project_dir> <output_file> [--signatures-only] [--no-docstrings]
+        python summarize-python-project.py <project_dir> <output_file> [--signatures-only] [--no-docstrings] [--workers N] [--cache DB]
+        python summarize-python-project.py <project_dir> [<output_file>] --index symbols.sqlite|symbols.jsonl
+        python summarize-python-project.py --index symbols.sqlite --lookup pkg.module.Class.method [--source]
+
+    Files are processed in sorted path order, so output is the same for any --workers value.
+    Summaries are written as they are produced, so memory use does not grow with the project.
+
+    --index also writes a symbol table (module, qualname, kind, signature, docstring,
+    decorators, line range) covering nested classes, functions, imports and module-level
+    assignments. --lookup queries a SQLite index without re-parsing the project.
     """
     parser = argparse.ArgumentParser(description="Summarize or dump Python files in a directory.")
-    parser.add_argument("project_dir", help="Directory to scan recursively for .py files")
-    parser.add_argument("output_file", help="Path to output file where results will be written")
+    parser.add_argument("project_dir", nargs="?", help="Directory to scan recursively for .py files")
+    parser.add_argument("output_file", nargs="?", help="Path to output file where results will be written, or - for stdout")
     parser.add_argument("--no-docstrings", action="store_true", help="Exclude docstrings from summary output")
     parser.add_argument("--signatures-only", action="store_true", help="Only output function/class signatures and imports")
+    parser.add_argument("--workers", type=int, default=1, help="Number of processes used to parse files (default: 1)")
+    parser.add_argument("--cache", help="SQLite file caching summaries between runs; only changed files are re-parsed")
+    parser.add_argument("--index", help="Write a symbol table to this SQLite (or .jsonl) file")
+    parser.add_argument("--lookup", metavar="NAME", help="Look up a symbol in the --index database and exit")
+    parser.add_argument("--source", action="store_true", help="With --lookup, also print each symbol's source")
     args = parser.parse_args()
 
+    if args.lookup:
+        if not args.index:
+            parser.error("--lookup requires --index")
+        if args.index.endswith(".jsonl"):
+            parser.error("--lookup needs a SQLite --index; search a .jsonl index with grep or jq")
+        if not os.path.isfile(args.index):
+            parser.error(f"--index {args.index} does not exist; build it with --index first")
+        sys.exit(lookup_symbols(args.index, args.lookup, args.source))
+    if not args.project_dir or not (args.output_file or args.index):
+        parser.error("project_dir and at least one of output_file or --index are required")
+
     include_docstrings = not args.no_docstrings
     project_path = Path(args.project_dir)
-    output_path = Path(args.output_file)
 
-    all_output = []
+    filepaths = sorted(filepath for filepath in project_path.rglob("*.py") if filepath.is_file())
 
-    for filepath in project_path.rglob("*.py"):
-        if filepath.is_file():
-            if args.signatures_only:
-                summary = extract_signatures(filepath, include_docstrings)
-            else:
-                summary = dump_file_contents(filepath)
-            all_output.append(summary)
+    if args.index:
+        count = write_symbol_index(args.index, iter_symbols(filepaths, project_path, args.workers))
+        print(f"Indexed {count:,} symbols from {len(filepaths):,} files into {args.index}", file=sys.stderr)
+        if not args.output_file:
+            return
+
+    cache = SummaryCache(args.cache, project_path, args.signatures_only, include_docstrings) if args.cache else None
+    summaries = summarize_files(filepaths, args.signatures_only, include_docstrings, args.workers, cache)
+
+    if args.output_file == "-":
+        output = contextlib.nullcontext(sys.stdout)
+    else:
+        output = open(args.output_file, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+    with output as out:
+        for summary in summaries:
+            out.write(summary)
 
-    output_path.write_text("".join(all_output), encoding="utf-8")
+    if cache:
+        cache.evict_missing(filepaths)
+        cache.close()
 
 if __name__ == "__main__":
     main()